@@ -5,20 +5,68 @@
 # Includes integrated ProbeSilent for silent probe querying
 
 import logging
+import io
 import os
 import csv
+import collections
+import configparser
+import functools
+import importlib.util
+import statistics
+import types
 from datetime import datetime
 
 # Matplotlib for plotting (optional)
+# Only checked here - imported on first plot (see AutoOffset._get_pyplot)
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+if not MATPLOTLIB_AVAILABLE:
+    logging.info("Matplotlib not available - plots disabled")
+
+# NumPy for sample statistics (optional)
 try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
-    MATPLOTLIB_AVAILABLE = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
 except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    logging.info("Matplotlib not available - plots disabled")
+    NUMPY_AVAILABLE = False
+
+# Marker for lazily resolved values that may legitimately be None
+_UNRESOLVED = object()
+
+# Parameter values that count as ON (compared after .upper())
+_TRUTHY = frozenset(('1', 'ON', 'YES', 'TRUE'))
+
+# Probing step sizes / tolerances (mm, s)
+STEP_FINE = 0.00125          # Python-polling step for trigger distance (1.25µm, like probe accuracy)
+SENSOR_POLL_INTERVAL = 0.001 # Reactor sensor poll (1ms)
+SENSOR_RECOVERY_LIFT = 10.0  # Max. lift to get a TRIGGERED sensor OPEN before probing down
+BISECT_RESOLUTION = 0.1      # Start search bisects down to this interval
+
+# matplotlib settings for our plots (applied per render, Klipper's rcParams stay untouched)
+PLOT_RC_PARAMS = {
+    'axes.unicode_minus': False,     # Plain '-' - no extra glyph lookup
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,  # Let Agg drop colinear points of the trend lines
+    'agg.path.chunksize': 10000,
+}
+
+# Max. bars in the probe-samples plot (more samples are thinned out, min/max kept)
+PLOT_MAX_BARS = 40
+
+# Console banners (easter eggs / milestone)
+EGG_BANNER = "🥚 ═══════════════════════════════════════════"
+MILESTONE_BANNER = "🎊 ═══════════════════════════════════════════ 🎊"
+
+# Columns of measurement_history.csv
+HISTORY_FIELDNAMES = ['timestamp', 'offset', 'nozzle_temp', 'bed_temp',
+                      'trigger_distance', 'stddev', 'sample1', 'sample2',
+                      'sample3', 'sample4', 'sample5']
+
+def _mean_min_max(values):
+    """Return (mean, min, max) of a non-empty sequence - one NumPy pass if available"""
+    if NUMPY_AVAILABLE:
+        arr = np.asarray(values, dtype=np.float64)
+        return float(arr.mean()), float(arr.min()), float(arr.max())
+    return sum(values) / len(values), min(values), max(values)
 
 #####################################################################
 # PROBE SILENT - Silent Probe Wrapper
@@ -28,20 +76,34 @@ class ProbeSilent:
     """Silent wrapper around the existing [probe].
     Registers QUERY_PROBE_SILENT without console output."""
     
+    __slots__ = ('printer', 'reference', 'last_query', '_probe', '_toolhead')
+    
     def __init__(self, config):
         self.printer = config.get_printer()
         self.reference = config.get('reference', 'probe')
         self.last_query = None
+        
+        # Objects (loaded in _handle_ready)
+        self._probe = None
+        self._toolhead = None
+        self.printer.register_event_handler("klippy:ready", self._handle_ready)
+    
+    def _handle_ready(self):
+        """Cache probe/toolhead so queries skip lookup_object"""
+        self._probe = self.printer.lookup_object(self.reference)
+        self._toolhead = self.printer.lookup_object('toolhead')
     
     def get_probe(self):
-        return self.printer.lookup_object(self.reference)
+        return self._probe
     
-    def query_and_update(self, gcmd=None):
-        """Query probe state silently (no console output)"""
-        probe = self.get_probe()
-        res = probe.mcu_probe.query_endstop(
-            self.printer.lookup_object('toolhead').get_last_move_time()
-        )
+    def query_and_update(self, gcmd=None, print_time=None):
+        """Query probe state silently (no console output)
+        print_time: optional, reuse a last-move-time the caller already has
+        """
+        probe = self._probe
+        if print_time is None:
+            print_time = self._toolhead.get_last_move_time()
+        res = probe.mcu_probe.query_endstop(print_time)
         # Store result locally and update original probe state
         self.last_query = res
         try:
@@ -55,14 +117,85 @@ class ProbeSilent:
         return res
     
     def get_status(self, eventtime=None):
-        probe = self.get_probe()
-        return probe.get_status(eventtime)
+        return self._probe.get_status(eventtime)
+
+#####################################################################
+# PROBE WRAPPER - mcu_endstop adapter for probing_move()
+#####################################################################
+
+def _noop():
+    pass
+
+def make_probe_wrapper(mcu_endstop, query_fn=None, invert=False):
+    """Build an mcu_endstop stand-in for probing_move() from pre-bound closures
+    query_fn: optional query callable(print_time), default mcu_endstop.query_endstop
+    invert=True: OPEN/TRIGGERED swapped - probing_move() stops at OPEN!
+    """
+    if query_fn is None:
+        query_fn = mcu_endstop.query_endstop
+    home_start = mcu_endstop.home_start
+    if invert:
+        raw_query = query_fn
+        raw_home_start = home_start
+        
+        def query_fn(print_time):
+            return not raw_query(print_time)
+        
+        def home_start(print_time, sample_time, sample_count, rest_time, triggered=True):
+            # Inverted: triggered=True means "stop at OPEN"
+            return raw_home_start(print_time, sample_time, sample_count, rest_time, not triggered)
+    
+    return types.SimpleNamespace(
+        query_endstop=query_fn,
+        home_start=home_start,
+        home_wait=mcu_endstop.home_wait,
+        home_finalize=mcu_endstop.home_finalize,
+        get_mcu=mcu_endstop.get_mcu,
+        add_stepper=mcu_endstop.add_stepper,
+        get_steppers=mcu_endstop.get_steppers,
+        # Only probe objects have these (plain MCU endstops don't)
+        multi_probe_begin=getattr(mcu_endstop, 'multi_probe_begin', _noop),
+        multi_probe_end=getattr(mcu_endstop, 'multi_probe_end', _noop),
+    )
 
 #####################################################################
 # AUTO OFFSET - Main Measurement System
 #####################################################################
 
 class AutoOffset:
+    # Singleton with many attributes accessed in the measurement loops - no __dict__
+    __slots__ = (
+        # Klipper objects
+        'printer', 'name', 'gcode', 'reactor', 'toolhead', 'probe', 'save_variables',
+        '_probe_run', '_probe_silent', '_z_steppers',
+        # Configuration
+        'debug_level', 'show_warnings', 'led_name', 'clean_macro',
+        'temp_enable', 'qgl_enable', 'clean_enable', 'accuracy_check_enable',
+        'trigger_distance_enable', 'offset_measure_enable',
+        'park_x', 'park_y', 'park_z', 'measure_x', 'measure_y', 'measure_z',
+        'preheat_nozzle_temp', 'preheat_bed_temp',
+        'probe_samples', 'probe_z_start', 'probe_tolerance', 'probe_speed',
+        'trigger_distance_max', 'sensor_pin', 'sensor_offset_path',
+        'sensor_offset_search_max', 'sensorhub_safety_percent', 'sensor_settle_time',
+        'measurement_count_milestone', 'create_plot', 'plot_path', 'plot_history_count',
+        'history_max_entries', '_history_csv_path',
+        '_measure_pos_str', '_park_pos_str', '_goto_measure_script',
+        '_home_and_park_script', '_egg_park_script',
+        'custom_sensor', 'custom_sensor_mcu', '_easter_eggs',
+        # Runtime state
+        'abort_active', 'tap_distance_old', 'tap_distance_new', 'sensor_offset_value',
+        'sensor_offset_start_z', 'macro_execution_count', '_pending_saves', '_led_timer', '_last_led',
+        'final_delta_offset', '_last_probe_samples', '_last_probe_stddev',
+        '_bed_center', '_sensor_query', '_sensor_query_fn', '_probe_query_fn', '_cached_custom_mcu_endstop',
+        # Runtime parameters (cmd__AUTO_OFFSET_START)
+        'debug_level_rt', 'temp_enable_rt', 'qgl_enable_rt', 'clean_enable_rt',
+        'accuracy_check_enable_rt', 'trigger_distance_enable_rt', 'offset_measure_enable_rt',
+        'preheat_nozzle_temp_rt', 'preheat_bed_temp_rt', '_measure_any_rt', '_phase_pipeline',
+        # Plot caches
+        '_plt', '_history_fig', '_current_fig', '_history_plot_key', '_history_cache', '_history_header_checked',
+        '_history_row_count', '_history_fh',
+    )
+    
     def __init__(self, config):
         self.printer = config.get_printer()
         self.name = config.get_name()
@@ -114,6 +247,7 @@ class AutoOffset:
         self.sensor_offset_path = config.get('sensor_offset_path', None)  # Existing sensor
         self.sensor_offset_search_max = config.getfloat('sensor_offset_search_max', 5.0)
         self.sensorhub_safety_percent = config.getfloat('sensorhub_safety_percent', 25)
+        self.sensor_settle_time = config.getfloat('sensor_settle_time', 0.2, minval=0.)  # Sensor debounce (s)
         
         # Statistics & Maintenance
         self.measurement_count_milestone = config.getint('measurement_count_milestone', 10)
@@ -122,6 +256,20 @@ class AutoOffset:
         self.create_plot = config.getint('create_plot', 1)
         self.plot_path = config.get('plot_path', '~/printer_data/config/Auto_Offset/Auswertung/')
         self.plot_history_count = config.getint('plot_history_count', 10)
+        self.history_max_entries = config.getint('history_max_entries', 0, minval=0)  # 0 = unlimited
+        
+        # Precomputed position strings / scripts (config is static)
+        self._measure_pos_str = f"X{self.measure_x} Y{self.measure_y} Z{self.measure_z}"
+        self._park_pos_str = f"X{self.park_x} Y{self.park_y}"
+        self._goto_measure_script = (f"G90\nG0 Z{self.measure_z} F3000\n"
+                                     f"G0 X{self.measure_x} Y{self.measure_y} F9000\nM400")
+        # End of measurement: move up, home Z, park, heaters off
+        self._home_and_park_script = ("G90\nG0 Z5 F600\nM400\nG28 Z\nM400\n"
+                                      f"G0 X{self.park_x} Y{self.park_y} Z{self.park_z} F6000\nM400\n"
+                                      "M104 S0\nM140 S0")
+        # Easter eggs: Z first, then fast XY to park
+        self._egg_park_script = (f"G90\nG0 Z{self.park_z} F6000\n"
+                                 f"G0 X{self.park_x} Y{self.park_y} F60000\nM400")
         
         # Runtime State
         self.abort_active = False
@@ -130,6 +278,28 @@ class AutoOffset:
         self.sensor_offset_value = 0.0
         self.sensor_offset_start_z = 0.0
         self.macro_execution_count = 0
+        self._pending_saves = {}  # Deferred save_variables writes (see _flush_saves)
+        self._led_timer = None  # Running LED animation (see _play_leds)
+        self._last_led = None  # Last (r, g, b) sent by _set_leds
+        self._bed_center = None  # (x, y), see _get_bed_center
+        
+        # Sensor/probe accessors, resolved on first query
+        self._sensor_query = self._query_custom_sensor_path  # Specialized in _handle_ready
+        self._sensor_query_fn = None
+        self._probe_query_fn = None
+        self._cached_custom_mcu_endstop = _UNRESOLVED
+        
+        # Plot figures + axes, created on first plot and reused afterwards
+        self._plt = None
+        self._history_fig = None
+        self._current_fig = None
+        self._history_plot_key = None  # (csv mtime, csv size, plot_history_count) of the saved history PNG
+        
+        # Parsed history CSV rows, keyed by path (see _load_history_rows)
+        self._history_cache = {}
+        self._history_header_checked = False
+        self._history_row_count = None  # Rows in measurement_history.csv (see _trim_history)
+        self._history_fh = None  # Open append handle (see _get_history_file)
         
         # Initialize debug_level_rt BEFORE _setup_custom_sensor (which calls _debug)
         self.debug_level_rt = self.debug_level
@@ -145,6 +315,14 @@ class AutoOffset:
         if not self.sensor_pin and not self.sensor_offset_path:
             raise config.error("Either 'sensor_pin' or 'sensor_offset_path' must be specified")
         
+        # Easter Eggs by (HEAT, QGL, CLEAN, ACCURACY_CHECK, TRIGGER_DISTANCE, OFFSET_MEASURE)
+        self._easter_eggs = {
+            (False, False, False, False, False, False): self.cmd_EASTER_EGG_SELF_DESTRUCT,  # All OFF
+            (True, False, False, False, False, False): self.cmd_EASTER_EGG_COFFEE,          # Only HEAT
+            (False, True, False, False, False, False): self.cmd_EASTER_EGG_DANCE,           # Only QGL
+            (False, False, True, False, False, False): self.cmd_EASTER_EGG_CLEAN_MODE,      # Only CLEAN
+        }
+        
         # Register commands manually (double underscore in function = single underscore in command)
         self.gcode.register_command(
             '_AUTO_OFFSET_START',
@@ -157,8 +335,9 @@ class AutoOffset:
             desc=self.cmd__AUTO_OFFSET_ABORT.__doc__
         )
         
-        # Register ready handler
+        # Register ready / disconnect handlers
         self.printer.register_event_handler("klippy:ready", self._handle_ready)
+        self.printer.register_event_handler("klippy:disconnect", self._close_history_file)
     
     def _setup_custom_sensor(self, config):
         """Setup custom sensor from sensor_pin configuration as real MCU endstop"""
@@ -174,12 +353,32 @@ class AutoOffset:
         # Override sensor_offset_path to indicate we use custom sensor
         self.sensor_offset_path = 'custom_mcu_endstop'
         
-        self._debug("SENSOR_SETUP", 1, f"✅ Custom MCU endstop created: {pin} → Direct MCU endstop")
+        self._debug("SENSOR_SETUP", 1, "✅ Custom MCU endstop created: %s → Direct MCU endstop", pin)
     
     def _handle_ready(self):
         """Called when Klipper is ready"""
         self.toolhead = self.printer.lookup_object('toolhead')
         self.probe = self.printer.lookup_object('probe')
+        # Direct probe API (bypasses the "PROBE" gcode command) - not on all Klipper versions
+        self._probe_run = getattr(self.probe, 'run_probe', None)
+        # ProbeSilent (registered in load_config) - query directly instead of QUERY_PROBE_SILENT
+        self._probe_silent = self.printer.lookup_object('probe_silent')
+        # Z steppers for binding custom sensor endstops (kinematics are fixed after ready)
+        self._z_steppers = [stepper for stepper in self.toolhead.get_kinematics().get_steppers()
+                            if stepper.is_active_axis('z')]
+        # Pick the sensor query variant once (custom_sensor_mcu is fixed after config)
+        if self.custom_sensor_mcu:
+            self._sensor_query = self._query_custom_sensor_fast
+        else:
+            self._sensor_query = self._query_custom_sensor_path
+        
+        # Resolve plot/history directory once (used by every measurement)
+        self.plot_path = os.path.abspath(os.path.expanduser(self.plot_path))
+        self._history_csv_path = os.path.join(self.plot_path, 'measurement_history.csv')
+        try:
+            os.makedirs(self.plot_path, exist_ok=True)
+        except Exception as e:
+            logging.warning("Could not create plot directory %s: %s", self.plot_path, e)
         
         # Load saved values
         try:
@@ -190,10 +389,11 @@ class AutoOffset:
             self.sensor_offset_start_z = all_vars.get('sensor_offset_start_z', 0.0)
             self.macro_execution_count = all_vars.get('macro_execution_count', 0)
         except Exception as e:
-            logging.warning(f"Could not load saved variables: {e}")
+            logging.warning("Could not load saved variables: %s", e)
     
     def cmd__AUTO_OFFSET_START(self, gcmd):
         """Main command - parses parameters and starts measurement (called as _AUTO_OFFSET_START)"""
+        self._last_led = None  # LEDs may have been changed outside since the last command
         # Parse parameters
         heat = gcmd.get('HEAT', str(self.temp_enable)).upper()
         qgl = gcmd.get('QGL', str(self.qgl_enable)).upper()
@@ -206,15 +406,18 @@ class AutoOffset:
         bed_temp = gcmd.get_float('PREHEAT_BED_TEMP', self.preheat_bed_temp)
         
         # Store runtime parameters
-        self.temp_enable_rt = (heat in ['1', 'ON', 'YES'])
-        self.qgl_enable_rt = (qgl in ['1', 'ON', 'YES'])
-        self.clean_enable_rt = (clean in ['1', 'ON', 'YES'])
-        self.accuracy_check_enable_rt = (accuracy in ['1', 'ON', 'YES'])
-        self.trigger_distance_enable_rt = (trigger in ['1', 'ON', 'YES'])
-        self.offset_measure_enable_rt = (offset in ['1', 'ON', 'YES'])
+        self.temp_enable_rt = heat in _TRUTHY
+        self.qgl_enable_rt = qgl in _TRUTHY
+        self.clean_enable_rt = clean in _TRUTHY
+        self.accuracy_check_enable_rt = accuracy in _TRUTHY
+        self.trigger_distance_enable_rt = trigger in _TRUTHY
+        self.offset_measure_enable_rt = offset in _TRUTHY
         self.debug_level_rt = debug
         self.preheat_nozzle_temp_rt = nozzle_temp
         self.preheat_bed_temp_rt = bed_temp
+        self._measure_any_rt = (self.accuracy_check_enable_rt or self.trigger_distance_enable_rt
+                                or self.offset_measure_enable_rt)
+        self._phase_pipeline = self._build_phase_pipeline()
         
         # Reset state
         self.abort_active = False
@@ -250,69 +453,54 @@ class AutoOffset:
         self.gcode.respond_info("✅ Abbruch abgeschlossen.")
     
     def _show_config(self):
-        """Show configuration"""
-        self.gcode.respond_info("--- Z-OFFSET MESSUNG KONFIGURATION ---")
+        """Show configuration (one console message, skipped at DEBUG=0)"""
+        if self.debug_level_rt < 1:
+            return
+        
+        lines = ["--- Z-OFFSET MESSUNG KONFIGURATION ---"]
         
         heat_msg = f"🔥 Heizen: {'ON' if self.temp_enable_rt else 'OFF'}"
         if self.temp_enable_rt:
             heat_msg += f" (Nozzle {self.preheat_nozzle_temp_rt}°C / Bed {self.preheat_bed_temp_rt}°C)"
-        self.gcode.respond_info(heat_msg)
+        lines.append(heat_msg)
         
         clean_msg = f"🧵 Reinigung: {'ON' if self.clean_enable_rt else 'OFF'}"
         if self.clean_enable_rt:
             clean_msg += f" ({self.clean_macro})"
-        self.gcode.respond_info(clean_msg)
-        
-        self.gcode.respond_info(f"🪜 QGL: {'ON' if self.qgl_enable_rt else 'OFF'}")
-        self.gcode.respond_info(f"🎯 Genauigkeitstest: {'ON' if self.accuracy_check_enable_rt else 'OFF'}")
-        self.gcode.respond_info(f"📏 Schaltabstand: {'ON' if self.trigger_distance_enable_rt else 'OFF'}")
-        self.gcode.respond_info(f"↕️ Z-Offset: {'ON' if self.offset_measure_enable_rt else 'OFF'}")
-        self.gcode.respond_info(f"⚙️ Gespeicherter Z-Offset: +{self.sensor_offset_value:.6f} mm")
-        self.gcode.respond_info("--------------------------------------")
+        lines.append(clean_msg)
+        
+        lines.append(f"🪜 QGL: {'ON' if self.qgl_enable_rt else 'OFF'}")
+        lines.append(f"🎯 Genauigkeitstest: {'ON' if self.accuracy_check_enable_rt else 'OFF'}")
+        lines.append(f"📏 Schaltabstand: {'ON' if self.trigger_distance_enable_rt else 'OFF'}")
+        lines.append(f"↕️ Z-Offset: {'ON' if self.offset_measure_enable_rt else 'OFF'}")
+        lines.append(f"⚙️ Gespeicherter Z-Offset: +{self.sensor_offset_value:.6f} mm")
+        lines.append("--------------------------------------")
+        self.gcode.respond_info("\n".join(lines))
     
     def _check_easter_eggs(self):
         """Check for Easter Egg combinations at START"""
-        temp = self.temp_enable_rt
-        qgl = self.qgl_enable_rt
-        clean = self.clean_enable_rt
-        acc = self.accuracy_check_enable_rt
-        tap = self.trigger_distance_enable_rt
-        sensor = self.offset_measure_enable_rt
-        
-        # Easter Egg 1: All OFF = Self-Destruct
-        if not temp and not qgl and not clean and not acc and not tap and not sensor:
-            self.cmd_EASTER_EGG_SELF_DESTRUCT(None)
-            return True
-        
-        # Easter Egg 2: Only HEAT=ON = Coffee Break (Sauna)
-        elif temp and not qgl and not clean and not acc and not tap and not sensor:
-            self.cmd_EASTER_EGG_COFFEE(None)
-            return True
-        
-        # Easter Egg 3: Only QGL=ON = Dance Mode
-        elif not temp and qgl and not clean and not acc and not tap and not sensor:
-            self.cmd_EASTER_EGG_DANCE(None)
-            return True
-        
-        # Easter Egg 4: Only CLEAN=ON = Clean Mode
-        elif not temp and not qgl and clean and not acc and not tap and not sensor:
-            self.cmd_EASTER_EGG_CLEAN_MODE(None)
-            return True
-        
-        # No Easter Egg
-        return False
+        key = (self.temp_enable_rt, self.qgl_enable_rt, self.clean_enable_rt,
+               self.accuracy_check_enable_rt, self.trigger_distance_enable_rt,
+               self.offset_measure_enable_rt)
+        easter_egg = self._easter_eggs.get(key)
+        if easter_egg is None:
+            # No Easter Egg
+            return False
+        
+        easter_egg(None)
+        return True
     
     def _run_safety_check(self):
         """Safety check: Verify TAP and Sensor are OPEN"""
         self._debug("AUTO_OFFSET_SAFETY", 2, "🔍 Starte Sicherheitsprüfung der genutzten Sensoren...")
         
-        # Query probe first
-        self.gcode.run_script_from_command("QUERY_PROBE_SILENT")
-        self.gcode.run_script_from_command("M400")
-        self.gcode.run_script_from_command("G4 P200")
+        # Query probe first (no motion until both sensors are checked -> same print_time)
+        self.toolhead.wait_moves()
+        print_time = self.toolhead.get_last_move_time()
+        self._probe_silent.query_and_update(print_time=print_time)
         
         # Check TAP sensor
-        tap_state = self._query_probe_state()
+        tap_state = self._query_probe_state(print_time)
         if tap_state:  # TRIGGERED
             self.gcode.respond_raw("!! ❌ TAP-Sensor TRIGGERED beim Start. Bitte prüfen!")
             self.abort_active = True
@@ -321,13 +509,13 @@ class AutoOffset:
             self._debug("AUTO_OFFSET_SAFETY", 2, "✅ TAP-Sensor: OPEN")
         
         # Check custom sensor
-        sensor_state = self._query_custom_sensor()
+        sensor_state = self._query_custom_sensor(print_time)
         if sensor_state:  # TRIGGERED
             self.gcode.respond_raw(f"!! ❌ Sensor '{self.sensor_offset_path}' TRIGGERED beim Start. Bitte prüfen!")
             self.abort_active = True
             return False
         else:
-            self._debug("AUTO_OFFSET_SAFETY", 2, f"✅ Sensor '{self.sensor_offset_path}': OPEN")
+            self._debug("AUTO_OFFSET_SAFETY", 2, "✅ Sensor '%s': OPEN", self.sensor_offset_path)
         
         self._debug("AUTO_OFFSET_SAFETY", 2, "✅ Sicherheitsprüfung abgeschlossen. Sensoren bereit.")
         return True
@@ -343,17 +531,23 @@ class AutoOffset:
             self.gcode.respond_raw(f"!! ❌ Easter Egg Fehler: {e}")
             return
         
+        self._debug("AUTO_OFFSET", 1, "🚀 Starte Auto-Offset-Messung...")
+        
+        # Save state and reset abort
         try:
-            self._debug("AUTO_OFFSET", 1, "🚀 Starte Auto-Offset-Messung...")
-            
-            # Save state and reset abort
             self.gcode.run_script_from_command("SAVE_GCODE_STATE NAME=TAP_MEAS")
-            self.abort_active = False
-            
+        except Exception as e:
+            logging.exception("Error in measurement")
+            self.gcode.respond_raw(f"!! ❌ Fehler: {e}")
+            return
+        self.abort_active = False
+        
+        # Every exit path below restores the state exactly once (finally)
+        finished = False
+        try:
             # Safety Check
             if not self._run_safety_check():
                 self._debug("AUTO_OFFSET", 1, "❌ Sicherheitsprüfung fehlgeschlagen - Abbruch")
-                self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
                 return
             
             # 1. Homing
@@ -365,129 +559,150 @@ class AutoOffset:
                 self._debug("AUTO_OFFSET", 1, "🏁 Homing bereits ausgeführt.")
             
             # Move to park position after homing
-            self.gcode.run_script_from_command("G90")
-            self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-            self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F9000")
-            self.gcode.run_script_from_command("M400")
-            
-            # 2. Heizen (Phase 6!)
-            if self.temp_enable_rt:
-                self._run_heating()
-            else:
-                self._debug("AUTO_OFFSET", 1, "⚙️ Heizen deaktiviert (HEAT=OFF)")
-            
-            # 3. QGL (Phase 6!)
-            if self.qgl_enable_rt:
-                self._run_qgl()
-                # Z-Homing nach QGL
-                self._debug("AUTO_OFFSET", 1, "🔁 Führe Z-Homing durch...")
-                self.gcode.run_script_from_command("G28 Z")
-            else:
-                self._debug("AUTO_OFFSET", 1, "⚙️ QGL deaktiviert (QGL=OFF)")
-            
-            # 5. Reinigung (Phase 6!)
-            if self.clean_enable_rt:
-                self._run_cleaning()
-            else:
-                self._debug("AUTO_OFFSET", 1, "⚙️ Reinigung deaktiviert (CLEAN=OFF)")
-            
-            # Check if any measurements are enabled
-            if not self.accuracy_check_enable_rt and not self.trigger_distance_enable_rt and not self.offset_measure_enable_rt:
-                self._debug("AUTO_OFFSET", 1, "⚙️ Keine Messungen aktiviert (ACCURACY_CHECK=OFF, TRIGGER_DISTANCE=OFF, OFFSET_MEASURE=OFF)")
-                self._debug("AUTO_OFFSET", 1, "✅ Heizen/QGL/Clean abgeschlossen – Messung übersprungen")
-                # Restore state and finish
-                self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
-                return
+            self._run_gcode_batch(
+                "G90",
+                f"G0 Z{self.park_z} F6000",
+                f"G0 {self._park_pos_str} F9000",
+                "M400"
+            )
             
-            # 6. Move to measurement position
-            self._debug("AUTO_OFFSET", 1, f"🎯 Fahre Messposition (X{self.measure_x} Y{self.measure_y} Z{self.measure_z})...")
-            self.gcode.run_script_from_command(f"G0 X{self.measure_x} Y{self.measure_y} Z{self.measure_z} F6000")
-            self.gcode.run_script_from_command("M400")
-            self.gcode.run_script_from_command("G4 P100")
+            # 2.-6. Enabled phases (pipeline built in cmd__AUTO_OFFSET_START)
+            for phase in self._phase_pipeline:
+                if self.abort_active:
+                    break
+                phase()
             
-            # Messungen durchführen - TAP Contact wenn mindestens EINE Messung aktiv ist
-            if self.accuracy_check_enable_rt or self.trigger_distance_enable_rt or self.offset_measure_enable_rt:
-                # 3. TAP Contact Phase - ZUERST! (setzt Z=0 als Referenz für ALLE Messungen)
-                self._run_tap_contact()
-                
-                # 4. Accuracy Check - NACH Z=0! (alle Probe-Werte ab Z=0)
-                if self.accuracy_check_enable_rt:
-                    accuracy_ok = self._run_accuracy_check()
-                    if not accuracy_ok:
-                        self._debug("AUTO_OFFSET", 1, "❌ Genauigkeitstest fehlgeschlagen - Abbruch")
-                        self.abort_active = True
-                        self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
-                        return
-                    
-                    # WICHTIG: Reference Probe - zurück zu Z=0 (ohne Z neu zu setzen!)
-                    # Nur wenn weitere Messungen folgen!
-                    if self.trigger_distance_enable_rt or self.offset_measure_enable_rt:
-                        # Erst hochfahren (Probe ist nach letztem Sample noch TRIGGERED!)
-                        self._debug("PROBE_TEST", 2, f"⬆️ Fahre hoch zu Z={self.measure_z} mm...")
-                        self.gcode.run_script_from_command("G90")
-                        self.gcode.run_script_from_command(f"G0 Z{self.measure_z} F3000")
-                        self.gcode.run_script_from_command("M400")
-                        
-                        # DANN Reference Probe zurück zu Z=0
-                        self._debug("PROBE_TEST", 2, "📍 Reference Probe: Fahre zurück zu Z=0...")
-                        self.gcode.run_script_from_command(f"PROBE PROBE_SPEED={self.probe_speed}")
-                        self.gcode.run_script_from_command("M400")
-                        # Query probe state for next measurement
-                        self.gcode.run_script_from_command("QUERY_PROBE_SILENT")
-                        self.gcode.run_script_from_command("G4 P50")
-                else:
-                    self._debug("AUTO_OFFSET", 1, "⚙️ Genauigkeitstest deaktiviert – fahre direkt zu Messungen.")
-                
-                # 5. Trigger Distance (Phase 2!)
-                if self.trigger_distance_enable_rt:
-                    self._run_trigger_distance()
-                else:
-                    self._debug("AUTO_OFFSET", 1, "⚙️ Schaltabstand deaktiviert")
-                    self.tap_distance_new = self.tap_distance_old
-                
-                # 6. Sensor Offset (Phase 3!)
-                if self.offset_measure_enable_rt:
-                    self._run_sensor_offset()
-                else:
-                    self._debug("AUTO_OFFSET", 1, f"⚙️ Z-Offset-Messung deaktiviert → Lade letzten gespeicherten Wert: {self.sensor_offset_value:.6f} mm")
-            else:
-                self._debug("AUTO_OFFSET", 1, "⚙️ Alle Messungen deaktiviert – nichts zu tun")
+            # Finished only if measurements ran (pipeline ends with _finish_measurement)
+            finished = self._measure_any_rt and not self.abort_active
             
-            # 6. Finish
-            self._finish_measurement()
+        except Exception as e:
+            logging.exception("Error in measurement")
+            self.gcode.respond_raw(f"!! ❌ Fehler: {e}")
+        finally:
+            # Keep values measured so far (e.g. trigger distance) on every exit -
+            # also on abort, so nothing stays queued for the next run
+            self._flush_saves()
             
-            # Restore state
-            self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
+            # IMPORTANT: Restore state on every exit (success, abort, exception)!
+            try:
+                self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
+            except Exception:
+                logging.exception("Could not restore gcode state")
+                finished = False
             
             # SET_GCODE_OFFSET NACH RESTORE (sonst wird er zurückgesetzt!)
             # Nutze DELTA statt absoluten Wert (alter Offset ist bereits aktiv!)
-            if hasattr(self, 'final_delta_offset'):
+            if finished:
                 self.gcode.run_script_from_command(f"SET_GCODE_OFFSET Z={self.final_delta_offset:.6f} MOVE=0")
                 if self.final_delta_offset >= 0:
                     self.gcode.respond_info(f"✅ GCODE Z-Offset Delta +{self.final_delta_offset:.6f} mm aktiv - bereit zum Testen!")
                 else:
                     self.gcode.respond_info(f"✅ GCODE Z-Offset Delta {self.final_delta_offset:.6f} mm aktiv - bereit zum Testen!")
-            
-        except Exception as e:
-            logging.exception("Error in measurement")
-            self.gcode.respond_raw(f"!! ❌ Fehler: {e}")
-            # IMPORTANT: Restore state even on exception!
-            try:
-                self.gcode.run_script_from_command("RESTORE_GCODE_STATE NAME=TAP_MEAS")
-            except:
-                pass  # In case SAVE was not done
     
-    def _run_heating(self):
-        """PHASE 6: Heat nozzle and bed to target temperatures"""
-        self._debug("AUTO_OFFSET", 1, f"🔥 Heize auf {self.preheat_nozzle_temp_rt}°C / {self.preheat_bed_temp_rt}°C...")
+    def _build_phase_pipeline(self):
+        """Build the list of phase callables for the current *_rt flags
+        Disabled phases only keep their status message
+        """
+        def skipped(msg):
+            return functools.partial(self._debug, "AUTO_OFFSET", 1, msg)
+        
+        pipeline = [
+            # 2. Heizen (Phase 6!)
+            self._run_heating if self.temp_enable_rt
+            else skipped("⚙️ Heizen deaktiviert (HEAT=OFF)"),
+            # 3. QGL (Phase 6!) + Z-Homing
+            self._run_qgl_and_home_z if self.qgl_enable_rt
+            else skipped("⚙️ QGL deaktiviert (QGL=OFF)"),
+            # 5. Reinigung (Phase 6!)
+            self._run_cleaning if self.clean_enable_rt
+            else skipped("⚙️ Reinigung deaktiviert (CLEAN=OFF)"),
+        ]
+        
+        # Check if any measurements are enabled
+        if not self._measure_any_rt:
+            pipeline.append(skipped("⚙️ Keine Messungen aktiviert (ACCURACY_CHECK=OFF, TRIGGER_DISTANCE=OFF, OFFSET_MEASURE=OFF)"))
+            pipeline.append(skipped("✅ Heizen/QGL/Clean abgeschlossen – Messung übersprungen"))
+            return pipeline
+        
+        # 6. Move to measurement position
+        # 3. TAP Contact Phase - ZUERST! (setzt Z=0 als Referenz für ALLE Messungen)
+        pipeline += [self._move_to_measure_position, self._run_tap_contact]
+        
+        # 4. Accuracy Check - NACH Z=0! (alle Probe-Werte ab Z=0)
+        if self.accuracy_check_enable_rt:
+            pipeline.append(self._run_accuracy_phase)
+            # Reference Probe nur wenn weitere Messungen folgen!
+            if self.trigger_distance_enable_rt or self.offset_measure_enable_rt:
+                pipeline.append(self._run_reference_probe)
+        else:
+            pipeline.append(skipped("⚙️ Genauigkeitstest deaktiviert – fahre direkt zu Messungen."))
+        
+        # 5. Trigger Distance (Phase 2!)
+        pipeline.append(self._run_trigger_distance if self.trigger_distance_enable_rt
+                        else self._skip_trigger_distance)
         
-        # Set temperatures (non-blocking)
-        self.gcode.run_script_from_command(f"M104 S{self.preheat_nozzle_temp_rt}")  # Nozzle
-        self.gcode.run_script_from_command(f"M140 S{self.preheat_bed_temp_rt}")    # Bed
+        # 6. Sensor Offset (Phase 3!)
+        pipeline.append(self._run_sensor_offset if self.offset_measure_enable_rt
+                        else skipped(f"⚙️ Z-Offset-Messung deaktiviert → Lade letzten gespeicherten Wert: {self.sensor_offset_value:.6f} mm"))
         
-        # Wait for temperatures (blocking)
-        self.gcode.run_script_from_command(f"M109 S{self.preheat_nozzle_temp_rt}")  # Wait nozzle
-        self.gcode.run_script_from_command(f"M190 S{self.preheat_bed_temp_rt}")    # Wait bed
+        # 6. Finish
+        pipeline.append(self._finish_measurement)
+        return pipeline
+    
+    def _move_to_measure_position(self):
+        """Move to measurement position"""
+        self._debug("AUTO_OFFSET", 1, "🎯 Fahre Messposition (%s)...", self._measure_pos_str)
+        self.gcode.run_script_from_command(f"G0 {self._measure_pos_str} F6000")
+        self._settle(100)
+    
+    def _run_qgl_and_home_z(self):
+        """QGL followed by Z-Homing"""
+        self._run_qgl()
+        # Z-Homing nach QGL
+        self._debug("AUTO_OFFSET", 1, "🔁 Führe Z-Homing durch...")
+        self.gcode.run_script_from_command("G28 Z")
+    
+    def _run_accuracy_phase(self):
+        """Accuracy check - sets abort_active if it fails"""
+        if not self._run_accuracy_check():
+            self._debug("AUTO_OFFSET", 1, "❌ Genauigkeitstest fehlgeschlagen - Abbruch")
+            self.abort_active = True
+    
+    def _run_reference_probe(self):
+        """Reference Probe - zurück zu Z=0 (ohne Z neu zu setzen!)"""
+        # Erst hochfahren (Probe ist nach letztem Sample noch TRIGGERED!)
+        self._debug("PROBE_TEST", 2, "⬆️ Fahre hoch zu Z=%s mm...", self.measure_z)
+        self._run_gcode_batch(
+            "G90",
+            f"G0 Z{self.measure_z} F3000",
+            "M400"
+        )
+        
+        # DANN Reference Probe zurück zu Z=0
+        self._debug("PROBE_TEST", 2, "📍 Reference Probe: Fahre zurück zu Z=0...")
+        self._run_gcode_batch(
+            f"PROBE PROBE_SPEED={self.probe_speed}",
+            "M400"
+        )
+        # Query probe state for next measurement
+        self._probe_silent.query_and_update()
+    
+    def _skip_trigger_distance(self):
+        """Trigger distance disabled - keep last stored value"""
+        self._debug("AUTO_OFFSET", 1, "⚙️ Schaltabstand deaktiviert")
+        self.tap_distance_new = self.tap_distance_old
+    
+    def _run_heating(self):
+        """PHASE 6: Heat nozzle and bed to target temperatures"""
+        self._debug("AUTO_OFFSET", 1, "🔥 Heize auf %s°C / %s°C...", self.preheat_nozzle_temp_rt, self.preheat_bed_temp_rt)
+        
+        # Set temperatures (non-blocking), then wait for them (blocking)
+        self._run_gcode_batch(
+            f"M104 S{self.preheat_nozzle_temp_rt}",  # Nozzle
+            f"M140 S{self.preheat_bed_temp_rt}",     # Bed
+            f"M109 S{self.preheat_nozzle_temp_rt}",  # Wait nozzle
+            f"M190 S{self.preheat_bed_temp_rt}"      # Wait bed
+        )
         
         self._debug("AUTO_OFFSET", 2, "✅ Zieltemperaturen erreicht")
     
@@ -499,74 +714,80 @@ class AutoOffset:
             self.gcode.run_script_from_command("QUAD_GANTRY_LEVEL")
             self._debug("AUTO_OFFSET", 2, "✅ QGL abgeschlossen")
         except Exception as e:
-            logging.warning(f"QGL failed: {e}")
-            self._debug("AUTO_OFFSET", 1, f"⚠️ QGL nicht verfügbar oder fehlgeschlagen: {e}")
+            logging.warning("QGL failed: %s", e)
+            self._debug("AUTO_OFFSET", 1, "⚠️ QGL nicht verfügbar oder fehlgeschlagen: %s", e)
     
     def _run_cleaning(self):
         """PHASE 6: Run nozzle cleaning"""
-        self._debug("AUTO_OFFSET", 1, f"🧹 Führe Düsenreinigung durch ({self.clean_macro})...")
+        self._debug("AUTO_OFFSET", 1, "🧹 Führe Düsenreinigung durch (%s)...", self.clean_macro)
         
         try:
-            self.gcode.run_script_from_command(self.clean_macro)
-            self.gcode.run_script_from_command("G0 Z10")
-            self.gcode.run_script_from_command("M400")
-            self.gcode.run_script_from_command("G4 P100")
+            self._run_gcode_batch(
+                self.clean_macro,
+                "G0 Z10"
+            )
+            self._settle(100)
             self._debug("AUTO_OFFSET", 2, "✅ Reinigung abgeschlossen")
         except Exception as e:
-            logging.warning(f"Cleaning failed: {e}")
-            self._debug("AUTO_OFFSET", 1, f"⚠️ Reinigung nicht verfügbar oder fehlgeschlagen: {e}")
+            logging.warning("Cleaning failed: %s", e)
+            self._debug("AUTO_OFFSET", 1, "⚠️ Reinigung nicht verfügbar oder fehlgeschlagen: %s", e)
     
     def _run_accuracy_check(self):
         """PHASE 4: Probe Accuracy Check - uses built-in PROBE_ACCURACY"""
-        self._debug("PROBE_TEST", 1, f"🎯 Starte Probe-Genauigkeitstest mit {self.probe_samples} Messungen...")
+        self._debug("PROBE_TEST", 1, "🎯 Starte Probe-Genauigkeitstest mit %s Messungen...", self.probe_samples)
         
         samples = self.probe_samples
         
         # Prepare
-        self.gcode.run_script_from_command("G90")
-        self.gcode.run_script_from_command("M400")
+        self._run_gcode_batch("G90", "M400")
         
         # Mache eigene Probes um Werte für Plot zu bekommen
         try:
             self._last_probe_samples = []
+            probe_gcmd = self.gcode.create_gcode_command("PROBE", "PROBE", {})
             
             for i in range(samples):
                 # Single probe
-                self.gcode.run_script_from_command("PROBE")
-                self.gcode.run_script_from_command("M400")
-                
-                # Get current Z position (probe result)
-                toolhead_pos = self.toolhead.get_position()
-                z_value = toolhead_pos[2]
+                if self._probe_run is not None:
+                    # Python API directly - no gcode parse/dispatch per sample
+                    epos = self._probe_run(probe_gcmd)
+                    z_value = epos[2]
+                else:
+                    self.gcode.run_script_from_command("PROBE\nM400")
+                    # Get current Z position (probe result)
+                    z_value = self.toolhead.get_position()[2]
                 self._last_probe_samples.append(z_value)
                 
                 # Retract for next probe
                 if i < samples - 1:  # Don't retract after last sample
-                    self.gcode.run_script_from_command("G91")
-                    self.gcode.run_script_from_command("G0 Z2.5 F300")
-                    self.gcode.run_script_from_command("G90")
-                    self.gcode.run_script_from_command("M400")
+                    # 2.5mm up @ 5mm/s (= G91 / G0 Z2.5 F300 / G90 / M400)
+                    retract_z = self.toolhead.get_position()[2] + 2.5
+                    self.toolhead.manual_move([None, None, retract_z], 5.0)
+                    self.toolhead.wait_moves()
             
             # Berechne Statistiken
             if len(self._last_probe_samples) > 1:
-                mean = sum(self._last_probe_samples) / len(self._last_probe_samples)
-                variance = sum((x - mean) ** 2 for x in self._last_probe_samples) / len(self._last_probe_samples)
-                self._last_probe_stddev = variance ** 0.5
-                probe_range = max(self._last_probe_samples) - min(self._last_probe_samples)
+                if NUMPY_AVAILABLE:
+                    arr = np.asarray(self._last_probe_samples)
+                    self._last_probe_stddev = float(arr.std())
+                    probe_range = float(np.ptp(arr))
+                else:
+                    self._last_probe_stddev = statistics.pstdev(self._last_probe_samples)
+                    probe_range = max(self._last_probe_samples) - min(self._last_probe_samples)
                 
-                self._debug("PROBE_TEST", 2, f"📊 Probe samples: {self._last_probe_samples}")
-                self._debug("PROBE_TEST", 1, f"📊 Range: {probe_range:.6f} mm | StdDev: {self._last_probe_stddev:.6f} mm")
+                self._debug("PROBE_TEST", 2, "📊 Probe samples: %s", self._last_probe_samples)
+                self._debug("PROBE_TEST", 1, "📊 Range: %.6f mm | StdDev: %.6f mm", probe_range, self._last_probe_stddev)
                 
                 # Check tolerance
                 if probe_range > self.probe_tolerance:
                     raise self.gcode.error(f"Probe range {probe_range:.6f}mm exceeds tolerance {self.probe_tolerance}mm")
             
-            self._debug("PROBE_TEST", 1, f"✅ Probe-Genauigkeit OK.")
+            self._debug("PROBE_TEST", 1, "✅ Probe-Genauigkeit OK.")
         
         except Exception as e:
             # PROBE_ACCURACY throws exception if tolerance not met
-            logging.warning(f"PROBE_ACCURACY failed: {e}")
-            self._debug("PROBE_TEST", 1, f"❌ Genauigkeitstest fehlgeschlagen: {e}")
+            logging.warning("PROBE_ACCURACY failed: %s", e)
+            self._debug("PROBE_TEST", 1, "❌ Genauigkeitstest fehlgeschlagen: %s", e)
             return False
         
         return True
@@ -574,7 +795,7 @@ class AutoOffset:
     def _run_tap_contact(self):
         """Initial contact with bed - set Z=0"""
         self._debug("TAP_CONTACT", 1, "📏 Starte Kontaktfahrt...")
-        self._debug("TAP_CONTACT", 1, f"⬇️ Fahre mit PROBE zum Bett, bis TAP auslöst ({self.probe_speed} mm/s)...")
+        self._debug("TAP_CONTACT", 1, "⬇️ Fahre mit PROBE zum Bett, bis TAP auslöst (%s mm/s)...", self.probe_speed)
         
         try:
             # Probe to bed - use our probe_speed!
@@ -583,29 +804,24 @@ class AutoOffset:
             self._debug("TAP_CONTACT", 1, "🔹 Kontakt erkannt – Position wird als Nullpunkt gesetzt.")
             
             # Set Z=0
-            self.gcode.run_script_from_command("SET_KINEMATIC_POSITION Z=0")
-            self.gcode.run_script_from_command("M400")
-            self.gcode.run_script_from_command("G4 P100")
-            
             # IMPORTANT: Update probe state after PROBE!
             # After PROBE the probe is TRIGGERED, but last_state must be updated
-            self.gcode.run_script_from_command("QUERY_PROBE_SILENT")
-            self.gcode.run_script_from_command("G4 P50")  # Short pause for state update
+            self.gcode.run_script_from_command("SET_KINEMATIC_POSITION Z=0")
+            self._settle(100)
+            self._probe_silent.query_and_update()
             
             # Debug: Check probe state
             probe_state = self._query_probe_state()
-            self._debug("TAP_CONTACT", 2, f"🔍 Probe State nach Contact: {'TRIGGERED' if probe_state else 'OPEN'}")
+            self._debug("TAP_CONTACT", 2, "🔍 Probe State nach Contact: %s", 'TRIGGERED' if probe_state else 'OPEN')
             
             self._debug("TAP_CONTACT", 1, "📍 Z=0 gesetzt – fahre zurück zur Messposition")
             
             # Zurück zur Messposition fahren (wichtig für Genauigkeitstest!)
-            self._debug("TAP_CONTACT", 2, f"⬆️ Fahre zurück zur Messposition (X{self.measure_x} Y{self.measure_y} Z{self.measure_z})...")
-            self.gcode.run_script_from_command("G90")
-            self.gcode.run_script_from_command(f"G0 Z{self.measure_z} F3000")  # Erst hoch in Z
-            self.gcode.run_script_from_command(f"G0 X{self.measure_x} Y{self.measure_y} F9000")  # Dann XY
-            self.gcode.run_script_from_command("M400")
+            self._debug("TAP_CONTACT", 2, "⬆️ Fahre zurück zur Messposition (%s)...", self._measure_pos_str)
+            # Erst hoch in Z, dann XY
+            self.gcode.run_script_from_command(self._goto_measure_script)
             
-            self._debug("TAP_CONTACT", 1, f"✅ Messposition erreicht (Z={self.measure_z} mm) – bereit für Messungen")
+            self._debug("TAP_CONTACT", 1, "✅ Messposition erreicht (Z=%s mm) – bereit für Messungen", self.measure_z)
                 
         except Exception as e:
             error_msg = f"❌ FEHLER: TAP Kontaktfahrt fehlgeschlagen: {e}"
@@ -619,7 +835,7 @@ class AutoOffset:
         max_z = self.trigger_distance_max
         speed = self.probe_speed
         
-        self._debug("TRIGGER_DISTANCE", 2, f"⬆️ Fahre hoch bis Probe OPEN (max {max_z:.6f} mm @ {speed:.1f} mm/s)...")
+        self._debug("TRIGGER_DISTANCE", 2, "⬆️ Fahre hoch bis Probe OPEN (max %.6f mm @ %.1f mm/s)...", max_z, speed)
         
         try:
             # Use new _probe_move_until_open() - hardware-based!
@@ -629,8 +845,8 @@ class AutoOffset:
             # Save Z value (trigger distance relative to Z=0)
             self.tap_distance_new = release_z
             self._save_variable('tap_last_distance', release_z)
-            self._debug("TRIGGER_DISTANCE", 2, f"💾 tap_last_distance gespeichert: Z={release_z:.6f} mm")
-            self._debug("TRIGGER_DISTANCE", 1, f"✅ Schaltabstand-Messung abgeschlossen. Z={release_z:.6f} mm")
+            self._debug("TRIGGER_DISTANCE", 2, "💾 tap_last_distance gespeichert: Z=%.6f mm", release_z)
+            self._debug("TRIGGER_DISTANCE", 1, "✅ Schaltabstand-Messung abgeschlossen. Z=%.6f mm", release_z)
             
         except Exception as e:
             error_msg = f"❌ FEHLER: Schaltabstand-Messung fehlgeschlagen: {e}"
@@ -648,13 +864,13 @@ class AutoOffset:
             return
         
         self.sensor_offset_start_z = start_z
-        self._debug("SENSOR_OFFSET", 1, f"✅ Startposition gefunden bei Z={start_z:.6f} mm")
+        self._debug("SENSOR_OFFSET", 1, "✅ Startposition gefunden bei Z=%.6f mm", start_z)
         self._save_variable('sensor_offset_start_z', start_z)
-        self._debug("SENSOR_OFFSET", 2, f"💾 Gespeichert: sensor_offset_start_z = {start_z:.6f} mm")
+        self._debug("SENSOR_OFFSET", 2, "💾 Gespeichert: sensor_offset_start_z = %.6f mm", start_z)
         
         # WICHTIG: Pause + Query damit Sensor-State aktualisiert wird!
-        self.gcode.run_script_from_command("G4 P200")
-        self.gcode.run_script_from_command("M400")
+        self.toolhead.dwell(self.sensor_settle_time)
+        self.toolhead.wait_moves()
         self._query_custom_sensor()  # State refresh
         self._debug("SENSOR_OFFSET", 2, "🔄 Sensor-State aktualisiert")
         
@@ -664,7 +880,7 @@ class AutoOffset:
         # Calculate safety limit
         safety_limit = self.tap_distance_new * (1 + self.sensorhub_safety_percent / 100)
         
-        self._debug("SENSOR_OFFSET", 2, f"📊 Sicherheitslimit: {safety_limit:.6f} mm (Schaltabstand {self.tap_distance_new:.6f} mm + {self.sensorhub_safety_percent:.0f}%)")
+        self._debug("SENSOR_OFFSET", 2, "📊 Sicherheitslimit: %.6f mm (Schaltabstand %.6f mm + %.0f%%)", safety_limit, self.tap_distance_new, self.sensorhub_safety_percent)
         
         # Safety check: Don't go below safety limit
         if self.tap_distance_new > 0:
@@ -672,16 +888,16 @@ class AutoOffset:
         else:
             target_z = 0.0  # No trigger distance measured, go to Z=0
         
-        self._debug("SENSOR_OFFSET", 2, f"⬇️ Fahre runter bis Sensor TRIGGERED (von Z={start_z:.6f} bis Z={target_z:.6f} mm)...")
+        self._debug("SENSOR_OFFSET", 2, "⬇️ Fahre runter bis Sensor TRIGGERED (von Z=%.6f bis Z=%.6f mm)...", start_z, target_z)
         
         try:
             # Use new _sensor_probe_move() - 10µm steps!
             trigger_z = self._sensor_probe_move(target_z, speed, direction='down')
             
-            self._debug("SENSOR_OFFSET", 2, f"💡 Sensor ausgelöst bei Z={trigger_z:.6f} mm")
+            self._debug("SENSOR_OFFSET", 2, "💡 Sensor ausgelöst bei Z=%.6f mm", trigger_z)
             self.sensor_offset_value = trigger_z
             self._save_variable('sensor_offset_value', trigger_z)
-            self._debug("SENSOR_OFFSET", 1, f"💾 sensor_offset_value gespeichert: {trigger_z:.6f} mm")
+            self._debug("SENSOR_OFFSET", 1, "💾 sensor_offset_value gespeichert: %.6f mm", trigger_z)
             
             # Move up to safe position
             self.toolhead.manual_move([None, None, 10.0], self.probe_speed * 2)
@@ -690,7 +906,7 @@ class AutoOffset:
             self._debug("SENSOR_OFFSET", 1, "✅ Sensor-Offset-Messung abgeschlossen")
             
         except Exception as e:
-            self._debug("SENSOR_OFFSET", 1, f"❌ Sensor-Offset-Messung fehlgeschlagen: {e}")
+            self._debug("SENSOR_OFFSET", 1, "❌ Sensor-Offset-Messung fehlgeschlagen: %s", e)
             return
     
     def _find_sensor_start_position(self):
@@ -702,60 +918,92 @@ class AutoOffset:
         speed = self.probe_speed
         
         # Try to use saved start position first (fast path!)
-        try:
+        # (save_variables swaps allVariables on every write - don't cache the dict)
+        saved_start_z = 0.0
+        if self.save_variables is not None:
             saved_start_z = self.save_variables.allVariables.get('sensor_offset_start_z', 0.0)
-        except:
-            saved_start_z = 0.0
         if saved_start_z > 0:
-            self._debug("SENSOR_OFFSET", 2, f"📍 Gespeicherte Startposition: {saved_start_z:.6f} mm – fahre direkt dorthin...")
+            self._debug("SENSOR_OFFSET", 2, "📍 Gespeicherte Startposition: %.6f mm – fahre direkt dorthin...", saved_start_z)
             # Move to saved position
-            self.gcode.run_script_from_command("G90")
-            self.gcode.run_script_from_command(f"G0 Z{saved_start_z:.6f} F{int(speed * 60)}")
-            self.gcode.run_script_from_command("M400")
+            self._run_gcode_batch("G90", f"G0 Z{saved_start_z:.6f} F{int(speed * 60)}", "M400")
             
             # Check if OPEN at saved position
             sensor_state = self._query_custom_sensor()
             if not sensor_state:  # OPEN!
-                self._debug("SENSOR_OFFSET", 2, f"✅ Sensor OPEN bei gespeicherter Position Z={saved_start_z:.6f} mm")
+                self._debug("SENSOR_OFFSET", 2, "✅ Sensor OPEN bei gespeicherter Position Z=%.6f mm", saved_start_z)
                 return saved_start_z
             else:
                 # TRIGGERED at saved position - need to go higher
-                self._debug("SENSOR_OFFSET", 2, f"⚠️ Sensor TRIGGERED bei gespeicherter Position – fahre weiter hoch...")
+                self._debug("SENSOR_OFFSET", 2, "⚠️ Sensor TRIGGERED bei gespeicherter Position – fahre weiter hoch...")
                 current_z = saved_start_z
         else:
             # No saved position - check current position
             sensor_state = self._query_custom_sensor()
             if not sensor_state:  # Already OPEN
-                self._debug("SENSOR_OFFSET", 2, f"✅ Sensor bereits OPEN bei Z={current_z:.6f} mm")
+                self._debug("SENSOR_OFFSET", 2, "✅ Sensor bereits OPEN bei Z=%.6f mm", current_z)
                 return current_z
         
         # Sensor is TRIGGERED - move up until OPEN!
-        self._debug("SENSOR_OFFSET", 2, f"⚠️ Sensor TRIGGERED bei Z={current_z:.6f} mm – fahre hoch bis OPEN (max {max_distance:.1f} mm)...")
-        
+        self._debug("SENSOR_OFFSET", 2, "⚠️ Sensor TRIGGERED bei Z=%.6f mm – fahre hoch bis OPEN (max %.1f mm)...", current_z, max_distance)
+        
+        # Bisection: lo is known TRIGGERED, narrow down to a ~0.1mm interval first
+        # (~log2(max_distance/0.1) queries instead of one per 50µm step)
+        lo = current_z
+        hi = current_z + max_distance
+        feed = int(speed * 60)
+        bisect_steps = 0
+        while hi - lo > BISECT_RESOLUTION:
+            mid = (lo + hi) / 2
+            self._run_gcode_batch("G90", f"G0 Z{mid:.6f} F{feed}", "M400")
+            bisect_steps += 1
+            if self._query_custom_sensor():
+                lo = mid  # still TRIGGERED
+            else:
+                hi = mid  # OPEN
+        self._debug("SENSOR_OFFSET", 2, "🔎 Bisektion: OPEN zwischen Z=%.6f und Z=%.6f mm (nach %s Schritten)", lo, hi, bisect_steps)
+        
+        # Back to the TRIGGERED side for the precise final move
+        # Caveat: the bisection changes direction, so with switch hysteresis the queries
+        # after a downward step read OPEN too early - lo/hi are only a hint, not a bracket
+        self._run_gcode_batch("G90", f"G0 Z{lo:.6f} F{feed}", "M400")
+        if not self._query_custom_sensor():
+            # Approached lo from the OPEN side and the switch hasn't re-triggered (hysteresis)
+            # - lo is an OPEN position, good enough as start position
+            self._debug("SENSOR_OFFSET", 2, "✅ Sensor OPEN bei Z=%.6f mm (Hysterese)", lo)
+            return lo
+        # Probing move stops at OPEN - keep the full search range as target, in case
+        # the real OPEN point lies above hi (hysteresis bias above)
         target_z = current_z + max_distance
         
         try:
-            # Use new _sensor_probe_move() - 10µm steps!
+            # Final lock-in: _sensor_probe_move() over the short remaining interval
             open_z = self._sensor_probe_move(target_z, speed, direction='up')
             
-            self._debug("SENSOR_OFFSET", 2, f"✅ Sensor OPEN bei Z={open_z:.6f} mm")
+            self._debug("SENSOR_OFFSET", 2, "✅ Sensor OPEN bei Z=%.6f mm", open_z)
             return open_z
             
         except Exception as e:
-            self._debug("SENSOR_OFFSET", 1, f"❌ Startposition nicht gefunden: {e}")
+            self._debug("SENSOR_OFFSET", 1, "❌ Startposition nicht gefunden: %s", e)
             return None
     
     def _get_custom_sensor_mcu_endstop(self):
         """Tries to get real MCU endstop object for hardware probing (fast)
         Returns None if sensor is Python-based (slow polling)
+        Resolved on first call, cached afterwards
         """
+        if self._cached_custom_mcu_endstop is _UNRESOLVED:
+            self._cached_custom_mcu_endstop = self._resolve_custom_sensor_mcu_endstop()
+        return self._cached_custom_mcu_endstop
+    
+    def _resolve_custom_sensor_mcu_endstop(self):
+        """Look up the MCU endstop behind sensor_offset_path (see _get_custom_sensor_mcu_endstop)"""
         sensor_path = self.sensor_offset_path
         if not sensor_path:
             return None
         
         # If we're using custom MCU endstop, return it directly
         if sensor_path == 'custom_mcu_endstop' and hasattr(self, 'custom_sensor_mcu'):
-            self._debug("SENSOR", 2, f"✅ Custom Sensor bereit")
+            self._debug("SENSOR", 2, "✅ Custom Sensor bereit")
             return self.custom_sensor_mcu
         
         try:
@@ -778,103 +1026,139 @@ class AutoOffset:
             
             # Search for mcu_endstop or button
             if hasattr(obj, 'mcu_endstop'):
-                self._debug("SENSOR", 2, f"✅ Sensor bereit: {sensor_path}")
+                self._debug("SENSOR", 2, "✅ Sensor bereit: %s", sensor_path)
                 return obj.mcu_endstop
             elif hasattr(obj, 'button'):
                 if hasattr(obj.button, 'mcu_endstop'):
-                    self._debug("SENSOR", 2, f"✅ Sensor bereit: {sensor_path}")
+                    self._debug("SENSOR", 2, "✅ Sensor bereit: %s", sensor_path)
                     return obj.button.mcu_endstop
             elif hasattr(obj, 'endstop'):
-                self._debug("SENSOR", 2, f"✅ Sensor bereit: {sensor_path}")
+                self._debug("SENSOR", 2, "✅ Sensor bereit: %s", sensor_path)
                 return obj.endstop
             
-            self._debug("SENSOR", 2, f"⚠️ Sensor {sensor_path} nutzt Python-Polling")
+            self._debug("SENSOR", 2, "⚠️ Sensor %s nutzt Python-Polling", sensor_path)
             
         except Exception as e:
-            logging.warning(f"Could not get mcu_endstop for sensor {sensor_path}: {e}")
+            logging.warning("Could not get mcu_endstop for sensor %s: %s", sensor_path, e)
         
         return None
     
-    def _query_custom_sensor(self):
+    def _query_custom_sensor(self, print_time=None):
         """Query custom sensor state - returns True if TRIGGERED, False if OPEN
         IMPORTANT: Makes real MCU query for current values!
+        print_time: optional, reuse a last-move-time the caller already has
         """
-        # If we have a custom_sensor MCU endstop, query it directly
-        if hasattr(self, 'custom_sensor_mcu') and self.custom_sensor_mcu:
-            try:
+        return self._sensor_query(print_time)
+    
+    def _query_custom_sensor_fast(self, print_time=None):
+        """_query_custom_sensor variant: direct query of the custom_sensor MCU endstop"""
+        # Runs inside reactor timers (PythonEndstop) - errors must not escape
+        try:
+            if print_time is None:
                 print_time = self.toolhead.get_last_move_time()
-                result = self.custom_sensor_mcu.query_endstop(print_time)
-                self._debug("SENSOR_QUERY", 2, f"🔍 MCU endstop state: {result}")
-                return result
-            except Exception as e:
-                self._debug("SENSOR_QUERY", 2, f"⚠️ MCU endstop query failed: {e}")
+            result = self.custom_sensor_mcu.query_endstop(print_time)
+            # Called per polling step - only format the message if it's shown
+            if self.debug_level_rt >= 2:
+                self._debug("SENSOR_QUERY", 2, "🔍 MCU endstop state: %s", result)
+            return result
+        except Exception as e:
+            self._debug("SENSOR_QUERY", 2, "⚠️ MCU endstop query failed: %s", e)
+        
+        # Fallback: Query via sensor_offset_path (like before the split)
+        return self._query_custom_sensor_path(print_time)
+    
+    def _query_custom_sensor_path(self, print_time=None):
+        """_query_custom_sensor variant: query via sensor_offset_path (accessor resolved once)"""
+        query_fn = self._sensor_query_fn
+        if query_fn is None:
+            query_fn = self._sensor_query_fn = self._resolve_sensor_query()
+        try:
+            return query_fn(print_time)
+        except Exception as e:
+            logging.warning("Could not query sensor %s: %s", self.sensor_offset_path, e)
         
-        # Fallback: Try to query via sensor_offset_path
+        return False
+    
+    def _resolve_sensor_query(self):
+        """Walk sensor_offset_path once and return the best query callable(print_time)"""
         sensor_path = self.sensor_offset_path
         if not sensor_path:
-            return False
-        
-        try:
-            # Navigate through path structure
-            parts = sensor_path.split('.')
-            obj = self.printer
-            for part in parts:
-                obj = getattr(obj, part, None)
-                if obj is None:
-                    return False
-            
-            # First try: query_endstop() for REAL MCU query
-            if hasattr(obj, 'query_endstop'):
-                print_time = self.toolhead.get_last_move_time()
+            return lambda print_time: False
+        
+        # Navigate through path structure
+        obj = self.printer
+        for part in sensor_path.split('.'):
+            obj = getattr(obj, part, None)
+            if obj is None:
+                return lambda print_time: False
+        
+        # First try: query_endstop() for REAL MCU query
+        if hasattr(obj, 'query_endstop'):
+            def query_fn(print_time):
+                if print_time is None:
+                    print_time = self.toolhead.get_last_move_time()
                 return obj.query_endstop(print_time)
-            
-            # Fallback: Cached states
-            if hasattr(obj, 'filament_present'):
-                return obj.filament_present
-            elif hasattr(obj, 'state'):
-                return obj.state
-            elif hasattr(obj, 'get_status'):
+            return query_fn
+        
+        # Fallback: Cached states
+        if hasattr(obj, 'filament_present'):
+            return lambda print_time: obj.filament_present
+        elif hasattr(obj, 'state'):
+            return lambda print_time: obj.state
+        elif hasattr(obj, 'get_status'):
+            def query_fn(print_time):
                 status = obj.get_status(self.reactor.monotonic())
                 return status.get('state', False) or status.get('last_query', False)
-            
-        except Exception as e:
-            logging.warning(f"Could not query sensor {sensor_path}: {e}")
+            return query_fn
         
-        return False
+        return lambda print_time: False
     
-    def _query_probe_state(self):
+    def _query_probe_state(self, print_time=None):
         """Query probe state - returns True if TRIGGERED, False if OPEN
         IMPORTANT: Makes real MCU query for current values!
+        print_time: optional, reuse a last-move-time the caller already has
         """
+        query_fn = self._probe_query_fn
+        if query_fn is None:
+            query_fn = self._probe_query_fn = self._resolve_probe_query()
         try:
-            # Use query_endstop() for REAL MCU query!
-            if hasattr(self.probe, 'mcu_probe'):
-                mcu_probe = self.probe.mcu_probe
-                if hasattr(mcu_probe, 'query_endstop'):
-                    print_time = self.toolhead.get_last_move_time()
-                    return mcu_probe.query_endstop(print_time)
-            
-            # Fallback: last_state (but outdated during movement!)
-            if hasattr(self.probe, 'last_state'):
-                return self.probe.last_state
-            
-            # Fallback 2: get_status
-            if hasattr(self.probe, 'get_status'):
-                status = self.probe.get_status(self.reactor.monotonic())
-                if 'last_query' in status:
-                    return status['last_query']
-                
+            return query_fn(print_time)
         except Exception as e:
-            logging.warning(f"Could not query probe state: {e}")
+            logging.warning("Could not query probe state: %s", e)
         
         return False
     
+    def _resolve_probe_query(self):
+        """Pick the best probe query callable(print_time) once"""
+        probe = self.probe
+        
+        # Use query_endstop() for REAL MCU query!
+        mcu_probe = getattr(probe, 'mcu_probe', None)
+        if mcu_probe is not None and hasattr(mcu_probe, 'query_endstop'):
+            def query_fn(print_time):
+                if print_time is None:
+                    print_time = self.toolhead.get_last_move_time()
+                return mcu_probe.query_endstop(print_time)
+            return query_fn
+        
+        # Fallback: last_state (but outdated during movement!)
+        if hasattr(probe, 'last_state'):
+            return lambda print_time: probe.last_state
+        
+        # Fallback 2: get_status
+        if hasattr(probe, 'get_status'):
+            def query_fn(print_time):
+                return probe.get_status(self.reactor.monotonic()).get('last_query', False)
+            return query_fn
+        
+        return lambda print_time: False
+    
     #####################################################################
     # PROBE MOVE FUNCTIONS (wie probe.py!)
     #####################################################################
     
     class PythonEndstop:
-        """Custom Python endstop with completion - works with drip_move()!
+        """Custom Python endstop with completion - works with probing_move()!
         Does EXACTLY the same as MCU endstop - but in Python!
         """
         def __init__(self, auto_offset, sensor_check_func, sensor_name, mcu_probe):
@@ -914,13 +1198,21 @@ class AutoOffset:
             # Define check callback
             def check_sensor(eventtime):
                 # Check if sensor reached desired state
-                if self.sensor_check_func() == self.triggered:
-                    # Sensor triggered!
-                    self.trigger_time = self.reactor.monotonic()
+                # (reactor timer - an exception here would take down klippy)
+                try:
+                    state = self.sensor_check_func()
+                except Exception:
+                    logging.exception("%s: sensor query failed - stopping move", self.sensor_name)
+                    self.completion.complete(0)  # trigger_time stays 0 -> probing_move() reports no trigger
+                    return self.reactor.NEVER
+                if state == self.triggered:
+                    # Sensor triggered! probing_move() expects a print_time, not reactor time
+                    self.trigger_time = self.mcu_probe.get_mcu().estimated_print_time(eventtime)
                     self.completion.complete(1)  # Complete!
                     return self.reactor.NEVER
                 # Continue checking
-                return eventtime + rest_time
+                # (homing's rest_time is far too short for Python polling)
+                return eventtime + SENSOR_POLL_INTERVAL
             
             # Register timer
             self.check_timer = self.reactor.register_timer(check_sensor, self.reactor.NOW)
@@ -947,7 +1239,7 @@ class AutoOffset:
                 try:
                     self.reactor.update_timer(self.check_timer, self.reactor.NEVER)
                     self.reactor.unregister_timer(self.check_timer)
-                except:
+                except Exception:
                     pass
                 self.check_timer = None
         
@@ -961,150 +1253,11 @@ class AutoOffset:
         def multi_probe_end(self):
             pass
     
-    class InvertedProbeWrapper:
-        """Wrapper around mcu_probe that inverts OPEN/TRIGGERED
-        So probing_move() stops at OPEN instead of TRIGGERED!
-        """
-        def __init__(self, mcu_probe):
-            self.mcu_probe = mcu_probe
-        
-        def query_endstop(self, print_time):
-            # Invert result!
-            return not self.mcu_probe.query_endstop(print_time)
-        
-        def multi_probe_begin(self):
-            self.mcu_probe.multi_probe_begin()
-        
-        def multi_probe_end(self):
-            self.mcu_probe.multi_probe_end()
-        
-        def get_mcu(self):
-            return self.mcu_probe.get_mcu()
-        
-        def add_stepper(self, stepper):
-            self.mcu_probe.add_stepper(stepper)
-        
-        def get_steppers(self):
-            return self.mcu_probe.get_steppers()
-        
-        # Homing methods called by probing_move()
-        def home_start(self, print_time, sample_time, sample_count, rest_time, triggered=True):
-            # Inverted: triggered=True means "stop at OPEN"
-            return self.mcu_probe.home_start(print_time, sample_time, sample_count, rest_time, not triggered)
-        
-        def home_wait(self, home_end_time):
-            return self.mcu_probe.home_wait(home_end_time)
-        
-        def home_finalize(self):
-            return self.mcu_probe.home_finalize()
-    
-    class CustomSensorWrapper:
-        """Wrapper around custom sensor as mcu_endstop
-        So probing_move() works with custom sensor!
-        """
-        def __init__(self, auto_offset, sensor_path, invert=False):
-            self.auto_offset = auto_offset
-            self.sensor_path = sensor_path
-            self.invert = invert
-            self.mcu = auto_offset.probe.mcu_probe.get_mcu()  # Use MCU from probe
-            # Take steppers from TAP probe
-            self.steppers = auto_offset.probe.mcu_probe.get_steppers()
-        
-        def query_endstop(self, print_time):
-            # Query custom sensor
-            state = self.auto_offset._query_custom_sensor()
-            # Invert if desired (for "until OPEN")
-            if self.invert:
-                return not state
-            return state
-        
-        def multi_probe_begin(self):
-            # Nothing to do
-            pass
-        
-        def multi_probe_end(self):
-            # Nothing to do
-            pass
-        
-        def get_mcu(self):
-            return self.mcu
-        
-        def add_stepper(self, stepper):
-            # Should not be called - already have steppers
-            pass
-        
-        def get_steppers(self):
-            return self.steppers
-        
-        # Homing methods called by probing_move()
-        def home_start(self, print_time, sample_time, sample_count, rest_time, triggered=True):
-            # Use same parameters as original mcu_probe
-            # But check with our custom sensor
-            # Since we implement query_endstop() ourselves, this will work
-            return self.auto_offset.probe.mcu_probe.home_start(
-                print_time, sample_time, sample_count, rest_time, triggered
-            )
-        
-        def home_wait(self, home_end_time):
-            return self.auto_offset.probe.mcu_probe.home_wait(home_end_time)
-        
-        def home_finalize(self):
-            return self.auto_offset.probe.mcu_probe.home_finalize()
-    
-    def _python_probing_move(self, target_pos, speed, sensor_check_func, sensor_name="Sensor"):
-        """Custom probing move implementation in Python.
-        
-        Uses drip_move() for non-blocking continuous movement with sensor polling.
-        
-        Args:
-            target_pos: [X, Y, Z] target position
-            speed: Speed in mm/s
-            sensor_check_func: Lambda that returns True when sensor triggers
-            sensor_name: Name for debug output
-        
-        Returns: [X, Y, Z] position where sensor triggered
-        """
-        start_pos = self.toolhead.get_position()
-        distance = abs(target_pos[2] - start_pos[2])
-        
-        self._debug("PYTHON_PROBE", 2, f"🔄 {sensor_name}: Start Z={start_pos[2]:.6f} → Ziel Z={target_pos[2]:.6f} ({distance:.6f}mm @ {speed}mm/s)")
-        
-        # Calculate small steps for continuous movement
-        # 50µm steps = very fine + fast enough
-        step_size = 0.05  # 50 micrometers
-        direction = 1 if target_pos[2] > start_pos[2] else -1
-        current_z = start_pos[2]
-        
-        step_count = 0
-        while True:
-            # Next step
-            current_z += direction * step_size
-            
-            # Don't go beyond target
-            if direction > 0 and current_z > target_pos[2]:
-                current_z = target_pos[2]
-            elif direction < 0 and current_z < target_pos[2]:
-                current_z = target_pos[2]
-            
-            # Move
-            self.toolhead.manual_move([None, None, current_z], speed)
-            self.toolhead.wait_moves()
-            
-            step_count += 1
-            
-            # Check sensor
-            if sensor_check_func():
-                # SENSOR TRIGGERED!
-                result_pos = self.toolhead.get_position()
-                self._debug("PYTHON_PROBE", 2, f"✅ {sensor_name} triggered bei Z={result_pos[2]:.6f}mm (nach {step_count} Schritten)")
-                return result_pos
-            
-            # Target reached?
-            if abs(current_z - target_pos[2]) < 0.001:  # 1µm tolerance
-                # Target reached, sensor not triggered
-                result_pos = self.toolhead.get_position()
-                self._debug("PYTHON_PROBE", 2, f"⚠️ {sensor_name} Ziel erreicht bei Z={result_pos[2]:.6f}mm - Sensor nicht triggered!")
-                return result_pos
+    def _probing_move_to(self, endstop, start_pos, target_z, speed):
+        """phoming.probing_move() from start_pos to target_z"""
+        target_pos = list(start_pos)
+        target_pos[2] = target_z
+        return self.printer.lookup_object('homing').probing_move(endstop, target_pos, speed)
     
     def _probe_move_until_open(self, max_distance, speed):
         """TAP PROBE UP until OPEN - WITH HARDWARE-MCU!
@@ -1119,109 +1272,55 @@ class AutoOffset:
         start_pos = self.toolhead.get_position()
         start_z = start_pos[2]
         
-        # Target position (move up!)
-        target_pos = list(start_pos)
-        target_pos[2] = start_z + max_distance
+        mcu_probe = self.probe.mcu_probe
+        if hasattr(mcu_probe, 'home_start'):
+            # ⚡ HARDWARE-MCU - stops on OPEN edge in firmware (µs precision)
+            self._debug("PROBE_MOVE", 2, "⬆️ TAP HOCH bis OPEN: Hardware-MCU %.6fmm @ %smm/s", max_distance, speed)
+            
+            # Z steppers are already bound to mcu_probe by [probe]
+            # Invert probe logic: probing_move stops at "TRIGGERED" which is actually OPEN!
+            inverted_probe = make_probe_wrapper(mcu_probe, invert=True)
+            try:
+                # Target position: move up!
+                result_pos = self._probing_move_to(inverted_probe, start_pos, start_z + max_distance, speed)
+            except self.printer.command_error as e:
+                self._raise_error(f"❌ Probe hat nicht released! Max {max_distance:.6f}mm erreicht. ({e})")
+            
+            self._debug("PROBE_MOVE", 2, "✅ Probe released bei Z=%.6fmm", result_pos[2])
+            return result_pos[2]
         
-        self._debug("PROBE_MOVE", 2, f"⬆️ TAP HOCH bis OPEN: Kontinuierliche Bewegung  {max_distance:.6f}mm @ {speed}mm/s")
+        # ⚠️ KEIN HARDWARE-MCU - Python-Polling
+        self._debug("PROBE_MOVE", 2, "⬆️ TAP HOCH bis OPEN: Python-Polling %.6fmm @ %smm/s", max_distance, speed)
         
         # MAXIMUM PRECISION for trigger distance!
         # 1.25µm steps for highest accuracy
-        step_size = 0.00125  # 1.25 micrometers (like probe accuracy)
+        end_z = start_z + max_distance
         current_z = start_z
         steps = 0
         
-        while current_z < (start_z + max_distance):
+        toolhead = self.toolhead
+        while current_z < end_z:
             # Next step
-            current_z += step_size
-            if current_z > (start_z + max_distance):
-                current_z = start_z + max_distance
+            current_z += STEP_FINE
+            if current_z > end_z:
+                current_z = end_z
             
             # Move fast
-            self.toolhead.manual_move([None, None, current_z], speed)
-            self.toolhead.wait_moves()
+            toolhead.manual_move([None, None, current_z], speed)
+            toolhead.wait_moves()
+            print_time = toolhead.get_last_move_time()
             
             steps += 1
             
-            # Check probe state
-            if not self._query_probe_state():
-                # OPEN!
-                result_pos = self.toolhead.get_position()
-                self._debug("PROBE_MOVE", 2, f"✅ Probe released bei Z={result_pos[2]:.6f}mm (nach {steps} Schritten)")
-                return result_pos[2]
+            # Check probe state (at the print_time the move just finished)
+            if not self._query_probe_state(print_time):
+                # OPEN! - manual_move() ended exactly at current_z
+                self._debug("PROBE_MOVE", 2, "✅ Probe released bei Z=%.6fmm (nach %s Schritten)", current_z, steps)
+                return current_z
         
         # Max reached without OPEN
         self._raise_error(f"❌ Probe hat nicht released! Max {max_distance:.6f}mm erreicht.")
     
-    def _python_probing_move_old_broken(self, target_pos, speed, sensor_check_func, sensor_name="Sensor"):
-        """PYTHON-PROBING: Continuous movement + sensor monitoring!
-        EXACTLY like original PROBE - but in Python for ALL sensors!
-        
-        Args:
-            target_pos: Target position [X, Y, Z]
-            speed: Speed in mm/s
-            sensor_check_func: Lambda that returns True when should stop
-            sensor_name: Name for debug output
-        
-        Returns: Position [X, Y, Z] where sensor triggered
-        """
-        start_pos = self.toolhead.get_position()
-        distance = abs(target_pos[2] - start_pos[2])
-        
-        self._debug("PYTHON_PROBE", 2, f"🔄 {sensor_name}: Kontinuierliche Bewegung {distance:.6f}mm @ {speed}mm/s")
-        
-        # Stop flag
-        stop_triggered = [False]
-        stop_position = [None]
-        
-        def check_sensor_callback(eventtime):
-            """Called by reactor during movement"""
-            if sensor_check_func():
-                # SENSOR TRIGGERED! Stoppe Bewegung!
-                stop_triggered[0] = True
-                self.toolhead.flush_step_generation()
-                stop_position[0] = self.toolhead.get_position()
-                return self.reactor.NEVER  # Stoppe Callback
-            
-            # Check if movement finished
-            current_pos = self.toolhead.get_position()
-            if abs(current_pos[2] - target_pos[2]) < 0.001:  # 1µm tolerance
-                # Movement finished, sensor not triggered
-                return self.reactor.NEVER
-            
-            # Continue checking - every 1ms!
-            return eventtime + 0.001
-        
-        # Start sensor monitoring (reactor callback!)
-        check_timer = self.reactor.register_timer(check_sensor_callback)
-        self.reactor.update_timer(check_timer, self.reactor.NOW)
-        
-        try:
-            # Start movement
-            self.toolhead.manual_move(target_pos, speed)
-            self.toolhead.wait_moves()
-            
-            # Stop timer
-            self.reactor.update_timer(check_timer, self.reactor.NEVER)
-            
-            if stop_triggered[0]:
-                # Sensor triggered!
-                result_pos = stop_position[0]
-                self._debug("PYTHON_PROBE", 2, f"✅ {sensor_name} triggered bei Z={result_pos[2]:.6f}mm")
-                return result_pos
-            else:
-                # Movement finished, sensor not triggered
-                result_pos = self.toolhead.get_position()
-                return result_pos
-                
-        finally:
-            # Cleanup: Stop timer in any case
-            try:
-                self.reactor.update_timer(check_timer, self.reactor.NEVER)
-                self.reactor.unregister_timer(check_timer)
-            except:
-                pass
-    
     def _sensor_probe_move(self, target_z, speed, direction='down', sensor_path=None):
         """CUSTOM SENSOR PROBE - HARDWARE-MCU IF AVAILABLE!
         Tries to use hardware MCU endstop (µs precision!)
@@ -1235,13 +1334,8 @@ class AutoOffset:
         
         start_pos = self.toolhead.get_position()
         
-        # Target position
-        target_pos = list(start_pos)
-        target_pos[2] = target_z
-        
         # Try to get hardware MCU endstop!
         sensor_mcu_endstop = self._get_custom_sensor_mcu_endstop()
-        phoming = self.printer.lookup_object('homing')
         
         if direction == 'down':
             # DOWN until TRIGGERED (like original PROBE!)
@@ -1249,51 +1343,41 @@ class AutoOffset:
             # Check if sensor is OPEN at start
             if self._query_custom_sensor():
                 # Sensor TRIGGERED → Fahre erst hoch bis OPEN!
-                self._debug("SENSOR_MOVE", 2, f"⚠️ Sensor bereits TRIGGERED → fahre hoch bis OPEN...")
+                self._debug("SENSOR_MOVE", 2, "⚠️ Sensor bereits TRIGGERED → fahre hoch bis OPEN...")
                 
-                # Move up in small steps until OPEN
-                up_target_z = start_pos[2] + 10.0
-                step_size = 0.05  # 50 micrometers
-                current_z = start_pos[2]
-                
-                while current_z < up_target_z:
-                    current_z += step_size
-                    if current_z > up_target_z:
-                        current_z = up_target_z
-                    
-                    self.toolhead.manual_move([None, None, current_z], speed)
-                    self.toolhead.wait_moves()
-                    
-                    if not self._query_custom_sensor():
-                        # OPEN gefunden!
-                        self._debug("SENSOR_MOVE", 2, f"✅ Sensor OPEN bei Z={current_z:.6f} mm")
-                        # Update start position für down move
-                        start_pos = self.toolhead.get_position()
-                        target_pos = list(start_pos)
-                        target_pos[2] = target_z
-                        break
-                else:
+                # One continuous move up, sensor polled until OPEN
+                up_target_z = start_pos[2] + SENSOR_RECOVERY_LIFT
+                python_endstop = self.PythonEndstop(
+                    self,
+                    lambda: not self._query_custom_sensor(),
+                    "Custom->OPEN",
+                    self.probe.mcu_probe
+                )
+                try:
+                    open_pos = self._probing_move_to(python_endstop, start_pos, up_target_z, speed)
+                except self.printer.command_error:
                     # Konnte OPEN nicht finden
                     raise self.gcode.error(f"❌ Konnte Sensor nicht OPEN bekommen (bis Z={up_target_z:.6f}mm)")
+                self._debug("SENSOR_MOVE", 2, "✅ Sensor OPEN bei Z=%.6f mm", open_pos[2])
+                # Update start position für down move
+                start_pos = self.toolhead.get_position()
             
             if sensor_mcu_endstop is not None:
                 # ⚡ HARDWARE-MCU AVAILABLE - µs PRECISION!
-                self._debug("SENSOR_MOVE", 2, f"⬇️ Sensor RUNTER bis TRIGGERED: {abs(target_z - start_pos[2]):.6f}mm @ {speed}mm/s")
+                self._debug("SENSOR_MOVE", 2, "⬇️ Sensor RUNTER bis TRIGGERED: %.6fmm @ %smm/s", abs(target_z - start_pos[2]), speed)
                 
                 # WICHTIG: Binde Z-Stepper an Endstop!
-                kin = self.toolhead.get_kinematics()
-                for stepper in kin.get_steppers():
-                    if stepper.is_active_axis('z'):
-                        sensor_mcu_endstop.add_stepper(stepper)
+                for stepper in self._z_steppers:
+                    sensor_mcu_endstop.add_stepper(stepper)
                 
                 # Use probing_move() like in andere.py!
                 try:
-                    result_pos = phoming.probing_move(sensor_mcu_endstop, target_pos, speed)
+                    result_pos = self._probing_move_to(sensor_mcu_endstop, start_pos, target_z, speed)
                 except self.printer.command_error as e:
                     raise self.gcode.error(f"❌ Sensor nicht triggered: {e}")
             else:
                 # ⚠️ KEIN HARDWARE-MCU - Python-Polling
-                self._debug("SENSOR_MOVE", 2, f"⬇️ Custom Sensor RUNTER bis TRIGGERED: Python-Polling (ms) {abs(target_z - start_pos[2]):.6f}mm @ {speed}mm/s")
+                self._debug("SENSOR_MOVE", 2, "⬇️ Custom Sensor RUNTER bis TRIGGERED: Python-Polling (ms) %.6fmm @ %smm/s", abs(target_z - start_pos[2]), speed)
                 
                 python_endstop = self.PythonEndstop(
                     self,
@@ -1302,13 +1386,13 @@ class AutoOffset:
                     self.probe.mcu_probe
                 )
                 
-                result_pos = phoming.probing_move(python_endstop, target_pos, speed)
-            
-            # Check if sensor triggered
-            if not self._query_custom_sensor():
-                raise self.gcode.error(f"❌ Sensor nicht triggered bis Z={target_z:.6f}mm")
+                result_pos = self._probing_move_to(python_endstop, start_pos, target_z, speed)
+                
+                # Check if sensor triggered (hardware probing_move() already guarantees it)
+                if not self._query_custom_sensor():
+                    raise self.gcode.error(f"❌ Sensor nicht triggered bis Z={target_z:.6f}mm")
             
-            self._debug("SENSOR_MOVE", 2, f"✅ Sensor TRIGGERED bei Z={result_pos[2]:.6f}mm")
+            self._debug("SENSOR_MOVE", 2, "✅ Sensor TRIGGERED bei Z=%.6fmm", result_pos[2])
             return result_pos[2]
             
         else:  # direction == 'up'
@@ -1320,54 +1404,40 @@ class AutoOffset:
             
             if sensor_mcu_endstop is not None:
                 # ⚡ HARDWARE-MCU AVAILABLE - USE INVERTED WRAPPER!
-                self._debug("SENSOR_MOVE", 2, f"⬆️ Sensor HOCH bis OPEN: {abs(target_z - start_pos[2]):.6f}mm @ {speed}mm/s")
+                self._debug("SENSOR_MOVE", 2, "⬆️ Sensor HOCH bis OPEN: %.6fmm @ %smm/s", abs(target_z - start_pos[2]), speed)
                 
                 # WICHTIG: Binde Z-Stepper an Endstop!
-                kin = self.toolhead.get_kinematics()
-                for stepper in kin.get_steppers():
-                    if stepper.is_active_axis('z'):
-                        sensor_mcu_endstop.add_stepper(stepper)
+                for stepper in self._z_steppers:
+                    sensor_mcu_endstop.add_stepper(stepper)
                 
                 # Invert sensor logic: TRIGGERED→OPEN, OPEN→TRIGGERED
-                inverted_sensor = self.InvertedProbeWrapper(sensor_mcu_endstop)
+                inverted_sensor = make_probe_wrapper(sensor_mcu_endstop, invert=True)
                 
                 # Now probing_move stops at "TRIGGERED" which is actually OPEN!
                 try:
-                    result_pos = phoming.probing_move(inverted_sensor, target_pos, speed)
+                    result_pos = self._probing_move_to(inverted_sensor, start_pos, target_z, speed)
                 except self.printer.command_error as e:
                     raise self.gcode.error(f"❌ Sensor nicht OPEN: {e}")
             else:
                 # ⚠️ KEIN HARDWARE-MCU - Python-Polling
-                self._debug("SENSOR_MOVE", 2, f"⬆️ Custom Sensor HOCH bis OPEN: Python-Polling (ms) {abs(target_z - start_pos[2]):.6f}mm @ {speed}mm/s")
-                
-                # Small steps with QUERY
-                step_size = 0.05  # 50 micrometers
-                current_z = start_pos[2]
-                steps = 0
+                self._debug("SENSOR_MOVE", 2, "⬆️ Custom Sensor HOCH bis OPEN: Python-Polling (ms) %.6fmm @ %smm/s", abs(target_z - start_pos[2]), speed)
                 
-                while current_z < target_z:
-                    current_z += step_size
-                    if current_z > target_z:
-                        current_z = target_z
-                    
-                    self.toolhead.manual_move([None, None, current_z], speed)
-                    self.toolhead.wait_moves()
-                    steps += 1
-                    
-                    if not self._query_custom_sensor():
-                        # OPEN!
-                        result_pos = self.toolhead.get_position()
-                        self._debug("SENSOR_MOVE", 2, f"✅ Sensor OPEN bei Z={result_pos[2]:.6f}mm (nach {steps} Schritten)")
-                        return result_pos[2]
+                python_endstop = self.PythonEndstop(
+                    self,
+                    lambda: not self._query_custom_sensor(),
+                    f"Custom({sensor_path})->OPEN",
+                    self.probe.mcu_probe
+                )
+                try:
+                    result_pos = self._probing_move_to(python_endstop, start_pos, target_z, speed)
+                except self.printer.command_error as e:
+                    raise self.gcode.error(f"❌ Sensor nicht OPEN: {e}")
                 
-                # Target reached without OPEN
-                result_pos = self.toolhead.get_position()
+                # Check if sensor open (hardware probing_move() already guarantees it)
+                if self._query_custom_sensor():
+                    raise self.gcode.error(f"❌ Sensor nicht OPEN bis Z={target_z:.6f}mm")
             
-            # Check if sensor open
-            if self._query_custom_sensor():
-                raise self.gcode.error(f"❌ Sensor nicht OPEN bis Z={target_z:.6f}mm")
-            
-            self._debug("SENSOR_MOVE", 2, f"✅ Sensor OPEN bei Z={result_pos[2]:.6f}mm")
+            self._debug("SENSOR_MOVE", 2, "✅ Sensor OPEN bei Z=%.6fmm", result_pos[2])
             return result_pos[2]
     
     def _finish_measurement(self):
@@ -1375,6 +1445,10 @@ class AutoOffset:
         OPTIMIZED ORDER: 1.Moves first 2.CPU-intensive plots 3.LEDs last
         This prevents MCU overload by separating MCU commands and CPU work!
         """
+        # Bound once - called many times below
+        run = self.gcode.run_script_from_command
+        respond = self.gcode.respond_info
+        
         self._debug("AUTO_OFFSET", 1, "✅ Z-Offset Messung beendet.")
         
         # ═══════════════════════════════════════════════════════════
@@ -1391,62 +1465,48 @@ class AutoOffset:
         
         # Show results
         if self.tap_distance_old > 0:
-            self.gcode.respond_info(f"📏 Schaltabstand: Aktuell={self.tap_distance_new:.6f} mm | Letzte={self.tap_distance_old:.6f} mm | Δ={delta:.6f} mm")
+            respond(f"📏 Schaltabstand: Aktuell={self.tap_distance_new:.6f} mm | Letzte={self.tap_distance_old:.6f} mm | Δ={delta:.6f} mm")
         else:
-            self.gcode.respond_info(f"📏 Schaltabstand: Aktuell={self.tap_distance_new:.6f} mm (Erstmessung)")
+            respond(f"📏 Schaltabstand: Aktuell={self.tap_distance_new:.6f} mm (Erstmessung)")
         
-        self.gcode.respond_info(f"⚙️ Z-Offset: {total_offset:.6f} mm")
+        respond(f"⚙️ Z-Offset: {total_offset:.6f} mm")
         
         # WICHTIG: ERST aktuellen probe.z_offset auslesen (VOR dem Überschreiben!)
         try:
             x_offset, y_offset, current_probe_offset = self.probe.get_offsets()
-            self._debug("OFFSET", 2, f"📖 z_offset aus probe.get_offsets(): {current_probe_offset}")
+            self._debug("OFFSET", 2, "📖 z_offset aus probe.get_offsets(): %s", current_probe_offset)
         except Exception as e:
-            self._debug("OFFSET", 1, f"⚠️ Konnte z_offset nicht auslesen: {e}")
+            self._debug("OFFSET", 1, "⚠️ Konnte z_offset nicht auslesen: %s", e)
             current_probe_offset = 0.0
         
-        # Debug-Ausgabe: Alte und neue Werte
-        self._debug("OFFSET", 1, f"💾 Aktueller probe.z_offset (aus Config): {current_probe_offset:.6f} mm")
-        self._debug("OFFSET", 1, f"💾 Neuer probe.z_offset (gemessen): {neg_offset:.6f} mm")
-        
-        # Berechne Delta
+        # Berechne Delta (Vorzeichen umkehren für GCODE)
         delta_offset = neg_offset - current_probe_offset
-        self._debug("OFFSET", 1, f"📊 Delta probe.z_offset: {delta_offset:.6f} mm")
-        
-        # Vorzeichen umkehren für GCODE
         delta_gcode_offset = -delta_offset
-        self._debug("OFFSET", 1, f"📊 Delta für GCODE Offset: {delta_gcode_offset:+.6f} mm")
+        
+        # Debug-Ausgabe: Alte und neue Werte in einer Meldung
+        self._debug("OFFSET", 1,
+                    "💾 probe.z_offset: Aktuell (aus Config)=%.6f mm | Neu (gemessen)=%.6f mm\n"
+                    "📊 Delta probe.z_offset=%.6f mm | Delta für GCODE Offset=%+.6f mm",
+                    current_probe_offset, neg_offset, delta_offset, delta_gcode_offset)
         
         # Update probe.z_offset
         try:
             configfile = self.printer.lookup_object('configfile')
             configfile.set('probe', 'z_offset', str(neg_offset))
-            self.gcode.respond_info(f"✅ probe.z_offset aktualisiert → SAVE_CONFIG zum dauerhaften Speichern")
+            respond(f"✅ probe.z_offset aktualisiert → SAVE_CONFIG zum dauerhaften Speichern")
         except Exception as e:
-            self.gcode.respond_info(f"⚠️ Konnte probe.z_offset nicht updaten: {e}")
+            respond(f"⚠️ Konnte probe.z_offset nicht updaten: {e}")
         
         # Speichere DELTA für später
         self.final_delta_offset = delta_gcode_offset
-        self.gcode.respond_info(f"📝 Führe SAVE_CONFIG aus um dauerhaft zu speichern")
+        respond(f"📝 Führe SAVE_CONFIG aus um dauerhaft zu speichern")
         
         # ═══════════════════════════════════════════════════════════
         # PHASE 2: MCU MOVES (alle auf einmal, dann fertig!)
         # ═══════════════════════════════════════════════════════════
         
-        # Move up and home
-        self.gcode.run_script_from_command("G90")
-        self.gcode.run_script_from_command("G0 Z5 F600")
-        self.gcode.run_script_from_command("M400")
-        self.gcode.run_script_from_command("G28 Z")
-        self.gcode.run_script_from_command("M400")
-        
-        # Park - MCU jetzt zur Ruheposition!
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} Z{self.park_z} F6000")
-        self.gcode.run_script_from_command("M400")  # Warte bis alles fertig!
-        
-        # Turn off heaters
-        self.gcode.run_script_from_command("M104 S0")
-        self.gcode.run_script_from_command("M140 S0")
+        # Move up and home, park (MCU jetzt zur Ruheposition!), turn off heaters
+        run(self._home_and_park_script)
         
         # ═══════════════════════════════════════════════════════════
         # PHASE 3: VARIABLEN SPEICHERN (I/O, kein MCU)
@@ -1455,8 +1515,9 @@ class AutoOffset:
         self._save_variable('tap_last_distance', self.tap_distance_new)
         self._save_variable('sensor_offset_value', self.sensor_offset_value)
         self._save_variable('macro_execution_count', self.macro_execution_count)
+        self._flush_saves()
         
-        self.gcode.respond_info(f"💾 Gespeichert: Schaltabstand={self.tap_distance_new:.6f} mm | Z-Offset={self.sensor_offset_value:.6f} mm")
+        respond(f"💾 Gespeichert: Schaltabstand={self.tap_distance_new:.6f} mm | Z-Offset={self.sensor_offset_value:.6f} mm")
         
         # ═══════════════════════════════════════════════════════════
         # PHASE 4: PLOTS ERSTELLEN (CPU 100%, aber MCU ruht! ✅)
@@ -1467,10 +1528,11 @@ class AutoOffset:
             try:
                 heater_nozzle = self.printer.lookup_object('extruder')
                 heater_bed = self.printer.lookup_object('heater_bed')
-                nozzle_temp = heater_nozzle.get_status(self.reactor.monotonic())['temperature']
-                bed_temp = heater_bed.get_status(self.reactor.monotonic())['temperature']
+                now = self.reactor.monotonic()
+                nozzle_temp = heater_nozzle.get_status(now)['temperature']
+                bed_temp = heater_bed.get_status(now)['temperature']
             except Exception as e:
-                logging.warning(f"Could not read temperatures: {e}")
+                logging.warning("Could not read temperatures: %s", e)
                 nozzle_temp = 0.0
                 bed_temp = 0.0
             
@@ -1491,26 +1553,65 @@ class AutoOffset:
         # ═══════════════════════════════════════════════════════════
         
         if self.macro_execution_count == self.measurement_count_milestone:
-            self.gcode.respond_info(" ")
-            self.gcode.respond_info("🎊 ═══════════════════════════════════════════ 🎊")
-            self.gcode.respond_info("🎉 MILESTONE ERREICHT! 🎉")
-            self.gcode.respond_info("🎊 ═══════════════════════════════════════════ 🎊")
-            self.gcode.run_script_from_command("G4 P1000")
+            respond(" ")
+            respond(MILESTONE_BANNER)
+            respond("🎉 MILESTONE ERREICHT! 🎉")
+            respond(MILESTONE_BANNER)
+            run("G4 P1000")
             self.cmd_EASTER_EGG_LOCKED(None)
     
     def _save_variable(self, name, value):
-        """Save variable to save_variables"""
+        """Queue variable for save_variables (written by _flush_saves)"""
+        self._pending_saves[name] = value
+    
+    def _flush_saves(self):
+        """Write all queued variables to save_variables in one file write"""
+        if not self._pending_saves:
+            return
+        pending = self._pending_saves
+        self._pending_saves = {}
         try:
-            if self.save_variables:
-                gcmd = self.gcode.create_gcode_command("SAVE_VARIABLE", "SAVE_VARIABLE",
-                                                       {'VARIABLE': name, 'VALUE': str(value)})
-                self.save_variables.cmd_SAVE_VARIABLE(gcmd)
+            if not self.save_variables:
+                return
+            if hasattr(self.save_variables, 'filename'):
+                self._write_save_variables(pending)
+            else:
+                # Unknown save_variables layout - one SAVE_VARIABLE (= one file rewrite) per value
+                self._run_gcode_batch(*[f"SAVE_VARIABLE VARIABLE={name} VALUE={value}"
+                                        for name, value in pending.items()])
         except Exception as e:
-            logging.warning(f"Could not save variable {name}: {e}")
+            logging.warning("Could not save variables %s: %s", ', '.join(pending), e)
     
-    def _debug(self, prefix, level, msg):
-        """Debug output"""
+    def _write_save_variables(self, pending):
+        """Merge pending into save_variables and rewrite its file once
+        Same file format as save_variables' own cmd_SAVE_VARIABLE
+        """
+        save_variables = self.save_variables
+        newvars = dict(save_variables.allVariables)
+        newvars.update(pending)
+        varfile = configparser.ConfigParser()
+        varfile.add_section('Variables')
+        for name, value in sorted(newvars.items()):
+            varfile.set('Variables', name, repr(value))
+        with open(save_variables.filename, 'w') as f:
+            varfile.write(f)
+        save_variables.allVariables = newvars
+    
+    def _run_gcode_batch(self, *lines):
+        """Run several G-code lines as one script (single parser pass)"""
+        self.gcode.run_script_from_command("\n".join(lines))
+    
+    def _settle(self, ms=100):
+        """Wait for moves, dwell ms and wait again (= M400 + G4 P<ms> + M400)"""
+        self.toolhead.wait_moves()
+        self.toolhead.dwell(ms / 1000.0)
+        self.toolhead.wait_moves()
+    
+    def _debug(self, prefix, level, msg, *args):
+        """Debug output - msg is %-formatted with args only if the level is shown"""
         if self.debug_level_rt >= level:
+            if args:
+                msg = msg % args
             self.gcode.respond_info(f"{prefix} {msg}")
     
     #####################################################################
@@ -1519,220 +1620,221 @@ class AutoOffset:
     
     def cmd_EASTER_EGG_SELF_DESTRUCT(self, gcmd):
         """🥚 Easter Egg 1: Self-destruct mode"""
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("🚨 SELBSTZERSTÖRUNGSMODUS AKTIVIERT! 🚨")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self._last_led = None  # LEDs may have been changed outside since the last command
+        # Bound once - called many times below
+        run = self.gcode.run_script_from_command
+        respond = self.gcode.respond_info
+        leds = self._set_leds
         
-        # Get bed center from kinematic rails
-        try:
-            kin = self.toolhead.get_kinematics()
-            rails = kin.rails
-            xlimit = rails[0].get_range()
-            ylimit = rails[1].get_range()
-            bed_center_x = (xlimit[0] + xlimit[1]) / 2
-            bed_center_y = (ylimit[0] + ylimit[1]) / 2
-        except:
-            # Fallback to default center
-            bed_center_x = 175.0
-            bed_center_y = 175.0
+        respond(EGG_BANNER)
+        respond("🚨 SELBSTZERSTÖRUNGSMODUS AKTIVIERT! 🚨")
+        respond(EGG_BANNER)
+        
+        bed_center_x, bed_center_y = self._get_bed_center()
         
         # Homing if needed
-        if 'xyz' not in self.toolhead.get_status(self.reactor.monotonic()).get('homed_axes', ''):
-            self.gcode.run_script_from_command("G28")
+        self._home_if_needed()
         
         # Move to park position
-        self.gcode.run_script_from_command("G90")
-        self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        run(self._egg_park_script)
         
         # LEDs white
-        self._set_leds(1, 1, 1)
-        self.gcode.run_script_from_command("G4 P1500")
+        leds(1, 1, 1)
+        run("G4 P1500")
         
         # Countdown
-        self.gcode.respond_info("⏱️  Countdown läuft...")
-        self.gcode.run_script_from_command("G4 P500")
+        respond("⏱️  Countdown läuft...")
+        run("G4 P500")
         
-        self._set_leds(1, 1, 0)  # Yellow
-        self.gcode.respond_info("💥 3...")
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(1, 1, 0)  # Yellow
+        respond("💥 3...")
+        run("G4 P2000")
         
-        self._set_leds(1, 0.5, 0)  # Orange
-        self.gcode.respond_info("💥 2...")
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(1, 0.5, 0)  # Orange
+        respond("💥 2...")
+        run("G4 P2000")
         
-        self._set_leds(1, 0, 0)  # Red
-        self.gcode.respond_info("💥 1...")
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(1, 0, 0)  # Red
+        respond("💥 1...")
+        run("G4 P2000")
         
-        self.gcode.respond_info("💣 BUMMMM!!! 💥💥💥")
-        self.gcode.run_script_from_command("G4 P300")
+        respond("💣 BUMMMM!!! 💥💥💥")
+        run("G4 P300")
         
         # Move to center and shake
-        self.gcode.run_script_from_command("G0 Z50 F6000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        self._run_gcode_batch(
+            "G0 Z50 F6000",
+            f"G0 X{bed_center_x} Y{bed_center_y} F60000",
+            "M400"
+        )
         
         # MEGA CHAOS shaking
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 40} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 40} Y{bed_center_y - 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 40} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y + 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 40} Y{bed_center_y + 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 40} Y{bed_center_y - 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 40} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y - 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x + 40} Y{bed_center_y} F60000",
+            f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000",
+            f"G0 X{bed_center_x + 40} Y{bed_center_y - 40} F60000",
+            f"G0 X{bed_center_x - 40} Y{bed_center_y} F60000",
+            f"G0 X{bed_center_x} Y{bed_center_y + 40} F60000",
+            f"G0 X{bed_center_x + 40} Y{bed_center_y + 40} F60000",
+            f"G0 X{bed_center_x - 40} Y{bed_center_y - 40} F60000",
+            f"G0 X{bed_center_x + 40} Y{bed_center_y} F60000",
+            f"G0 X{bed_center_x} Y{bed_center_y - 40} F60000",
+            f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000",
+            f"G0 X{bed_center_x} Y{bed_center_y} F60000",
+            "M400"
+        )
         
         # Reveal
-        self.gcode.run_script_from_command("G4 P500")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("😂 GLÜCK GEHABT - WAR NUR EIN SPASS! 😂")
-        self.gcode.respond_info("🎉 Easter Egg 1/5 gefunden!")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        run("G4 P500")
+        respond(EGG_BANNER)
+        respond("😂 GLÜCK GEHABT - WAR NUR EIN SPASS! 😂")
+        respond("🎉 Easter Egg 1/5 gefunden!")
+        respond(EGG_BANNER)
         
-        self._set_leds(0, 1, 0)  # Green
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(0, 1, 0)  # Green
+        run("G4 P2000")
         
         # Return to park
-        self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        run(self._egg_park_script)
         
-        self.gcode.respond_info("✅ Easter Egg abgeschlossen - Drucker ist OK! 🎊")
-        self.gcode.run_script_from_command("G4 P5000")
-        self._set_leds(1, 1, 1)  # White
+        respond("✅ Easter Egg abgeschlossen - Drucker ist OK! 🎊")
+        run("G4 P5000")
+        leds(1, 1, 1)  # White
     
     def cmd_EASTER_EGG_DANCE(self, gcmd):
         """🥚 Easter Egg 3: Drucker-Tanz"""
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("💃 TANZ-MODUS AKTIVIERT! 💃")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self._last_led = None  # LEDs may have been changed outside since the last command
+        # Bound once - called many times below
+        run = self.gcode.run_script_from_command
+        respond = self.gcode.respond_info
+        leds = self._set_leds
         
-        # Get bed center from kinematic rails
-        try:
-            kin = self.toolhead.get_kinematics()
-            rails = kin.rails
-            xlimit = rails[0].get_range()
-            ylimit = rails[1].get_range()
-            bed_center_x = (xlimit[0] + xlimit[1]) / 2
-            bed_center_y = (ylimit[0] + ylimit[1]) / 2
-        except:
-            # Fallback to default center
-            bed_center_x = 175.0
-            bed_center_y = 175.0
+        respond(EGG_BANNER)
+        respond("💃 TANZ-MODUS AKTIVIERT! 💃")
+        respond(EGG_BANNER)
         
-        if 'xyz' not in self.toolhead.get_status(self.reactor.monotonic()).get('homed_axes', ''):
-            self.gcode.run_script_from_command("G28")
+        bed_center_x, bed_center_y = self._get_bed_center()
         
-        self.gcode.run_script_from_command("G90")
-        self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        self._home_if_needed()
         
-        self._set_leds(1, 1, 1)
-        self.gcode.run_script_from_command("G4 P1500")
+        run(self._egg_park_script)
+        
+        leds(1, 1, 1)
+        run("G4 P1500")
         
-        self.gcode.respond_info("🎵 Musik läuft... der Drucker tanzt!")
-        self.gcode.run_script_from_command("G4 P500")
+        respond("🎵 Musik läuft... der Drucker tanzt!")
+        run("G4 P500")
         
         # Dance choreography with LED colors
-        self._set_leds(1, 0, 0)  # Red
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 50} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command("G4 P200")
+        leds(1, 0, 0)  # Red
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x + 50} Y{bed_center_y} F60000",
+            "G4 P200"
+        )
         
-        self._set_leds(1, 1, 0)  # Yellow
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 50} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command("G4 P200")
+        leds(1, 1, 0)  # Yellow
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x - 50} Y{bed_center_y} F60000",
+            "G4 P200"
+        )
         
-        self._set_leds(0, 1, 0)  # Green
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y + 75} F30000")
-        self.gcode.run_script_from_command("G4 P500")
+        leds(0, 1, 0)  # Green
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x} Y{bed_center_y + 75} F30000",
+            "G4 P500"
+        )
         
-        self._set_leds(0, 1, 1)  # Cyan
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 30} Y{bed_center_y - 30} F45000")
-        self.gcode.run_script_from_command("G4 P300")
+        leds(0, 1, 1)  # Cyan
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x + 30} Y{bed_center_y - 30} F45000",
+            "G4 P300"
+        )
         
-        self._set_leds(0, 0, 1)  # Blue
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000")
-        self.gcode.run_script_from_command("G4 P150")
+        leds(0, 0, 1)  # Blue
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x - 40} Y{bed_center_y + 40} F60000",
+            "G4 P150"
+        )
         
-        self._set_leds(1, 0, 1)  # Magenta
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x + 60} Y{bed_center_y} F60000")
-        self.gcode.run_script_from_command("G4 P150")
+        leds(1, 0, 1)  # Magenta
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x + 60} Y{bed_center_y} F60000",
+            "G4 P150"
+        )
         
-        self._set_leds(1, 0.5, 0)  # Orange
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y - 50} F35000")
-        self.gcode.run_script_from_command("G4 P400")
+        leds(1, 0.5, 0)  # Orange
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x} Y{bed_center_y - 50} F35000",
+            "G4 P400"
+        )
         
-        self._set_leds(1, 1, 1)  # White - finale
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F20000")
-        self.gcode.run_script_from_command("G4 P800")
-        self.gcode.run_script_from_command("M400")
+        leds(1, 1, 1)  # White - finale
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x} Y{bed_center_y} F20000",
+            "G4 P800",
+            "M400"
+        )
         
-        self.gcode.run_script_from_command("G4 P500")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("🕺 TANZ BEENDET!")
-        self.gcode.respond_info("😂 Der Drucker kann tanzen... aber nicht gut!")
-        self.gcode.respond_info("🎉 Easter Egg 3/5 gefunden!")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        run("G4 P500")
+        respond(EGG_BANNER)
+        respond("🕺 TANZ BEENDET!")
+        respond("😂 Der Drucker kann tanzen... aber nicht gut!")
+        respond("🎉 Easter Egg 3/5 gefunden!")
+        respond(EGG_BANNER)
         
-        self._set_leds(0, 1, 0)
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(0, 1, 0)
+        run("G4 P2000")
         
-        self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        run(self._egg_park_script)
         
-        self.gcode.respond_info("✅ Tanz-Modus beendet - Drucker ist OK! 🎊")
-        self.gcode.run_script_from_command("G4 P5000")
-        self._set_leds(1, 1, 1)
+        respond("✅ Tanz-Modus beendet - Drucker ist OK! 🎊")
+        run("G4 P5000")
+        leds(1, 1, 1)
     
     def cmd_EASTER_EGG_COFFEE(self, gcmd):
         """🥚 Easter Egg 2: Sauna-Modus"""
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self._last_led = None  # LEDs may have been changed outside since the last command
+        self.gcode.respond_info(EGG_BANNER)
         self.gcode.respond_info("🧖 SAUNA-MODUS AKTIVIERT! 🔥")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         
-        if 'xyz' not in self.toolhead.get_status(self.reactor.monotonic()).get('homed_axes', ''):
-            self.gcode.run_script_from_command("G28")
+        self._home_if_needed()
         
-        self.gcode.run_script_from_command("G90")
-        self.gcode.run_script_from_command(f"G0 Z{self.park_z} F6000")
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} F60000")
-        self.gcode.run_script_from_command("M400")
+        self.gcode.run_script_from_command(self._egg_park_script)
         
         self._set_leds(1, 1, 1)
         self.gcode.run_script_from_command("G4 P1500")
         
         self._set_leds(1, 0, 0)  # Red
         self.gcode.respond_info("🔥 Heize auf MAXIMUM...")
-        self.gcode.run_script_from_command(f"M140 S{self.preheat_bed_temp}")
-        self.gcode.run_script_from_command(f"M104 S{self.preheat_nozzle_temp}")
-        self.gcode.run_script_from_command("G4 P1000")
+        self._run_gcode_batch(
+            f"M140 S{self.preheat_bed_temp}",
+            f"M104 S{self.preheat_nozzle_temp}",
+            "G4 P1000"
+        )
         
         self._set_leds(1, 0.5, 0)  # Orange
         self.gcode.respond_info("♨️  Warte auf Temperatur...")
-        self.gcode.run_script_from_command(f"M190 S{self.preheat_bed_temp}")
-        self.gcode.run_script_from_command(f"M109 S{self.preheat_nozzle_temp}")
+        self._run_gcode_batch(
+            f"M190 S{self.preheat_bed_temp}",
+            f"M109 S{self.preheat_nozzle_temp}"
+        )
         
         self._set_leds(1, 1, 0)  # Yellow
         self.gcode.run_script_from_command("G4 P1000")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         self.gcode.respond_info("🔥 SAUNA IST HEISS!")
         self.gcode.respond_info("😂 Schwitz schön... war nur ein Spaß!")
         self.gcode.respond_info("🎉 Easter Egg 2/5 gefunden!")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         
         self._set_leds(0, 1, 0)
         self.gcode.run_script_from_command("G4 P2000")
         
-        self.gcode.run_script_from_command("M104 S0")
-        self.gcode.run_script_from_command("M140 S0")
+        self._run_gcode_batch(
+            "M104 S0",
+            "M140 S0"
+        )
         
         self.gcode.respond_info("✅ Sauna-Modus beendet - Drucker ist OK! 🎊")
         self.gcode.run_script_from_command("G4 P5000")
@@ -1740,36 +1842,32 @@ class AutoOffset:
     
     def cmd_EASTER_EGG_CLEAN_MODE(self, gcmd):
         """🥚 Easter Egg 4: Putz-Modus"""
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("🧹 PUTZ-MODUS AKTIVIERT! 🧹")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self._last_led = None  # LEDs may have been changed outside since the last command
+        # Bound once - called many times below
+        run = self.gcode.run_script_from_command
+        respond = self.gcode.respond_info
+        leds = self._set_leds
         
-        # Get bed center from kinematic rails
-        try:
-            kin = self.toolhead.get_kinematics()
-            rails = kin.rails
-            xlimit = rails[0].get_range()
-            ylimit = rails[1].get_range()
-            bed_center_x = (xlimit[0] + xlimit[1]) / 2
-            bed_center_y = (ylimit[0] + ylimit[1]) / 2
-        except:
-            # Fallback to default center
-            bed_center_x = 175.0
-            bed_center_y = 175.0
+        respond(EGG_BANNER)
+        respond("🧹 PUTZ-MODUS AKTIVIERT! 🧹")
+        respond(EGG_BANNER)
         
-        if 'xyz' not in self.toolhead.get_status(self.reactor.monotonic()).get('homed_axes', ''):
-            self.gcode.run_script_from_command("G28")
+        bed_center_x, bed_center_y = self._get_bed_center()
         
-        self._set_leds(0.3, 0.3, 0.3)  # Dark white
-        self.gcode.run_script_from_command("G4 P1500")
+        self._home_if_needed()
+        
+        leds(0.3, 0.3, 0.3)  # Dark white
+        run("G4 P1500")
         
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F18000")
-        self.gcode.run_script_from_command("M400")
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x} Y{bed_center_y} F18000",
+            "M400"
+        )
         
-        self.gcode.respond_info("😱 Hier ist aber dreckig!")
-        self.gcode.run_script_from_command("G4 P800")
-        self.gcode.respond_info("🧼 Starte intensive Reinigung...")
-        self.gcode.run_script_from_command("G4 P500")
+        respond("😱 Hier ist aber dreckig!")
+        run("G4 P800")
+        respond("🧼 Starte intensive Reinigung...")
+        run("G4 P500")
         
         # Distance from center for cleaning corners
         clean_distance = 80.0
@@ -1783,57 +1881,60 @@ class AutoOffset:
         ]
         
         for name, x, y, brightness in corners:
-            self._set_leds(brightness, brightness, brightness)
-            self.gcode.respond_info(f"🧹 Putze {name}...")
-            self.gcode.run_script_from_command(f"G0 X{x} Y{y} F18000")
-            self.gcode.run_script_from_command("M400")
-            self.gcode.run_script_from_command("G4 P200")
-            
-            # Wiggle 4x
-            for _ in range(2):
-                self.gcode.run_script_from_command(f"G0 X{x - 5} Y{y} F18000")
-                self.gcode.run_script_from_command(f"G0 X{x + 5} Y{y} F18000")
-            self.gcode.run_script_from_command(f"G0 X{x} Y{y} F18000")
-            self.gcode.run_script_from_command("M400")
+            leds(brightness, brightness, brightness)
+            respond(f"🧹 Putze {name}...")
+            # Approach + wiggle 4x as one script
+            wiggle = [f"G0 X{x - 5} Y{y} F18000", f"G0 X{x + 5} Y{y} F18000"] * 2
+            self._run_gcode_batch(
+                f"G0 X{x} Y{y} F18000",
+                "M400",
+                "G4 P200",
+                *wiggle,
+                f"G0 X{x} Y{y} F18000",
+                "M400"
+            )
         
         # Polish center (8x wiggle)
-        self._set_leds(1.0, 1.0, 1.0)
-        self.gcode.respond_info("✨ Poliere die Mitte...")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F18000")
-        self.gcode.run_script_from_command("M400")
-        self.gcode.run_script_from_command("G4 P200")
-        
-        for _ in range(4):
-            self.gcode.run_script_from_command(f"G0 X{bed_center_x - 5} Y{bed_center_y} F18000")
-            self.gcode.run_script_from_command(f"G0 X{bed_center_x + 5} Y{bed_center_y} F18000")
-        self.gcode.run_script_from_command(f"G0 X{bed_center_x} Y{bed_center_y} F18000")
-        self.gcode.run_script_from_command("M400")
-        self.gcode.run_script_from_command("G4 P800")
-        
-        self.gcode.run_script_from_command("G4 P500")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
-        self.gcode.respond_info("✨ ALLES BLITZSAUBER!")
-        self.gcode.respond_info("😂 ...oder doch nicht? War nur ein Spaß!")
-        self.gcode.respond_info("🎉 Easter Egg 4/5 gefunden!")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        leds(1.0, 1.0, 1.0)
+        respond("✨ Poliere die Mitte...")
+        wiggle = [f"G0 X{bed_center_x - 5} Y{bed_center_y} F18000",
+                  f"G0 X{bed_center_x + 5} Y{bed_center_y} F18000"] * 4
+        self._run_gcode_batch(
+            f"G0 X{bed_center_x} Y{bed_center_y} F18000",
+            "M400",
+            "G4 P200",
+            *wiggle,
+            f"G0 X{bed_center_x} Y{bed_center_y} F18000",
+            "M400",
+            "G4 P800",
+            "G4 P500"
+        )
+        respond(EGG_BANNER)
+        respond("✨ ALLES BLITZSAUBER!")
+        respond("😂 ...oder doch nicht? War nur ein Spaß!")
+        respond("🎉 Easter Egg 4/5 gefunden!")
+        respond(EGG_BANNER)
         
-        self._set_leds(0, 1, 0)
-        self.gcode.run_script_from_command("G4 P2000")
+        leds(0, 1, 0)
+        run("G4 P2000")
         
-        self.gcode.respond_info("✅ Putz-Modus beendet - Drucker ist OK! 🎊")
+        respond("✅ Putz-Modus beendet - Drucker ist OK! 🎊")
         
-        self.gcode.run_script_from_command(f"G0 X{self.park_x} Y{self.park_y} Z{self.park_z} F6000")
-        self.gcode.run_script_from_command("M400")
+        self._run_gcode_batch(
+            f"G0 X{self.park_x} Y{self.park_y} Z{self.park_z} F6000",
+            "M400"
+        )
         
-        self.gcode.run_script_from_command("G4 P5000")
-        self._set_leds(1, 1, 1)
+        run("G4 P5000")
+        leds(1, 1, 1)
     
     def cmd_EASTER_EGG_LOCKED(self, gcmd):
         """🥚 Easter Egg 5: Drucker gesperrt (Counter-basiert)"""
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self._last_led = None  # LEDs may have been changed outside since the last command
+        self.gcode.respond_info(EGG_BANNER)
         self.gcode.respond_info(f"🎊 MILESTONE ERREICHT! (Messung #{self.macro_execution_count})")
         self.gcode.respond_info("🔒 DRUCKER GESPERRT!")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         
         self.gcode.run_script_from_command("G4 P2000")
         
@@ -1846,35 +1947,103 @@ class AutoOffset:
         self.gcode.run_script_from_command("G4 P3000")
         
         self._set_leds(0, 1, 0)  # Green
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         self.gcode.respond_info("😂 ENTSPERRT! War nur ein Spaß!")
         self.gcode.respond_info("🎉 Easter Egg 5/5 gefunden! ALLE GEFUNDEN! 🏆")
-        self.gcode.respond_info("🥚 ═══════════════════════════════════════════")
+        self.gcode.respond_info(EGG_BANNER)
         
         self.gcode.run_script_from_command("G4 P3000")
         self._set_leds(1, 1, 1)
     
+    def _get_bed_center(self):
+        """Bed center (x, y) from the kinematic rails - computed once (config-constant)"""
+        if self._bed_center is None:
+            try:
+                rails = self.toolhead.get_kinematics().rails
+                xlimit = rails[0].get_range()
+                ylimit = rails[1].get_range()
+                self._bed_center = ((xlimit[0] + xlimit[1]) / 2, (ylimit[0] + ylimit[1]) / 2)
+            except Exception:
+                # Fallback to default center
+                self._bed_center = (175.0, 175.0)
+        return self._bed_center
+    
+    def _home_if_needed(self):
+        """G28 unless all axes are homed (kinematics status only, not the full toolhead status)"""
+        homed_axes = self.toolhead.get_kinematics().get_status(self.reactor.monotonic()).get('homed_axes', '')
+        if 'xyz' not in homed_axes:
+            self.gcode.run_script_from_command("G28")
+    
     def _set_leds(self, r, g, b):
         """Helper to set LED colors"""
         # Skip wenn led_name leer oder None ist
         if not self.led_name or self.led_name.strip() == "":
             return
         
+        # A direct color change overrides a running animation
+        self._stop_leds()
+        
+        # Same color as last time - skip the SET_LED round trip
+        color = (r, g, b)
+        if color == self._last_led:
+            return
+        self._last_led = color
         try:
             self.gcode.run_script_from_command(f"SET_LED LED={self.led_name} RED={r} GREEN={g} BLUE={b}")
         except Exception as e:
-            logging.warning(f"Could not set LEDs: {e}")
+            logging.warning("Could not set LEDs: %s", e)
+    
+    def _play_leds(self, steps):
+        """Play an LED animation from a reactor timer - steps: [(time_s, r, g, b), ...]
+        No G4 dwells in the motion queue - the calling command returns immediately
+        (timer takes the gcode mutex for SET_LED, like [delayed_gcode])
+        """
+        if not self.led_name or self.led_name.strip() == "":
+            return
+        
+        self._stop_leds()
+        self._last_led = None  # Animation leaves the LEDs in an unknown state for _set_leds
+        pending = collections.deque(steps)
+        handle = None  # This animation's timer (assigned below)
+        
+        def play_step(eventtime):
+            step_time, r, g, b = pending.popleft()
+            # Waits while a command (e.g. ABORT, PRINT_START) holds the mutex
+            with self.gcode.get_mutex():
+                if self._led_timer is not handle:
+                    # Superseded by a newer animation while waiting - don't touch the LEDs
+                    return self.reactor.NEVER
+                try:
+                    self.gcode.run_script_from_command(f"SET_LED LED={self.led_name} RED={r} GREEN={g} BLUE={b}")
+                except Exception as e:
+                    logging.warning("LED animation failed: %s", e)
+                    pending.clear()
+            if not pending:
+                # Final state applied - unregister instead of leaving the timer parked at NEVER
+                if self._led_timer is handle:
+                    self._stop_leds()
+                return self.reactor.NEVER
+            # Next step relative to when this one actually ran - a mutex wait
+            # must not make the remaining steps fire back-to-back
+            return self.reactor.monotonic() + (pending[0][0] - step_time)
+        
+        handle = self._led_timer = self.reactor.register_timer(
+            play_step, self.reactor.monotonic() + pending[0][0])
+    
+    def _stop_leds(self):
+        """Cancel a running LED animation"""
+        if self._led_timer is not None:
+            self.reactor.unregister_timer(self._led_timer)
+            self._led_timer = None
     
     def _led_error(self):
         """LED feedback on error: Blink red for 3 seconds"""
-        try:
-            for _ in range(6):  # 6x blink = 3 seconds
-                self._set_leds(1, 0, 0)  # Red on
-                self.gcode.run_script_from_command("G4 P250")  # 250ms
-                self._set_leds(0, 0, 0)  # Off
-                self.gcode.run_script_from_command("G4 P250")  # 250ms
-        except Exception as e:
-            logging.warning(f"LED error animation failed: {e}")
+        # 6x blink: 250ms red, 250ms off
+        steps = []
+        for i in range(6):
+            steps.append((i * 0.5, 1, 0, 0))         # Red on
+            steps.append((i * 0.5 + 0.25, 0, 0, 0))  # Off
+        self._play_leds(steps)
     
     def _raise_error(self, message):
         """Raise error with LED feedback"""
@@ -1883,22 +2052,14 @@ class AutoOffset:
     
     def _led_success(self):
         """LED feedback on success: Blink green → Green on → Off"""
-        try:
-            # Blink green 3x
-            for _ in range(3):
-                self._set_leds(0, 1, 0)  # Green on
-                self.gcode.run_script_from_command("G4 P300")  # 300ms
-                self._set_leds(0, 0, 0)  # Off
-                self.gcode.run_script_from_command("G4 P200")  # 200ms
-            
-            # Green on for 2 seconds
-            self._set_leds(0, 1, 0)  # Green on
-            self.gcode.run_script_from_command("G4 P2000")  # 2s
-            
-            # Off
-            self._set_leds(0, 0, 0)
-        except Exception as e:
-            logging.warning(f"LED success animation failed: {e}")
+        self._play_leds([
+            # Blink green 3x (300ms on, 200ms off)
+            (0.0, 0, 1, 0), (0.3, 0, 0, 0),
+            (0.5, 0, 1, 0), (0.8, 0, 0, 0),
+            (1.0, 0, 1, 0), (1.3, 0, 0, 0),
+            # Green on for 2 seconds, then off
+            (1.5, 0, 1, 0), (3.5, 0, 0, 0),
+        ])
     
     #####################################################################
     # HISTORY & PLOT FUNCTIONS
@@ -1911,43 +2072,34 @@ class AutoOffset:
             samples = getattr(self, '_last_probe_samples', [final_offset] * 5)
             stddev = getattr(self, '_last_probe_stddev', 0.0)
             
-            # Ensure plot directory exists
-            plot_dir = os.path.expanduser(self.plot_path)
-            os.makedirs(plot_dir, exist_ok=True)
+            # CSV file path (plot_path is resolved + created in _handle_ready)
+            csv_path = self._history_csv_path
             
-            # CSV file path
-            csv_path = os.path.join(plot_dir, 'measurement_history.csv')
+            # Migrate old column layout once
+            self._check_history_header(csv_path)
             
-            # Check if file exists to write header
-            file_exists = os.path.isfile(csv_path)
+            # sample1..sample5 in one pass, padded with '' if fewer samples
+            sample_fields = [f'{sample:.6f}' for sample in samples[:5]]
+            sample_fields += [''] * (5 - len(sample_fields))
             
-            # Append measurement to CSV
-            with open(csv_path, 'a', newline='') as csvfile:
-                fieldnames = ['timestamp', 'offset', 'nozzle_temp', 'bed_temp', 
-                             'trigger_distance', 'stddev', 'sample1', 'sample2', 
-                             'sample3', 'sample4', 'sample5']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                # Write header if new file
-                if not file_exists:
-                    writer.writeheader()
-                
-                # Write measurement
-                writer.writerow({
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'offset': f'{final_offset:.6f}',
-                    'nozzle_temp': f'{nozzle_temp:.1f}',
-                    'bed_temp': f'{bed_temp:.1f}',
-                    'trigger_distance': f'{self.tap_distance_new:.6f}',
-                    'stddev': f'{stddev:.6f}',
-                    'sample1': f'{samples[0]:.6f}' if len(samples) > 0 else '',
-                    'sample2': f'{samples[1]:.6f}' if len(samples) > 1 else '',
-                    'sample3': f'{samples[2]:.6f}' if len(samples) > 2 else '',
-                    'sample4': f'{samples[3]:.6f}' if len(samples) > 3 else '',
-                    'sample5': f'{samples[4]:.6f}' if len(samples) > 4 else ''
-                })
-            
-            self._debug("HISTORY", 1, f"📄 Messung gespeichert in CSV: {csv_path}")
+            # Append measurement to CSV (only the new row is written)
+            # Values are plain numbers/timestamp (never need quoting), so the line is
+            # formatted directly in HISTORY_FIELDNAMES order instead of via csv.writer
+            csvfile = self._get_history_file()
+            
+            # Write header if new/empty file (append mode starts at the end)
+            if csvfile.tell() == 0:
+                csvfile.write(','.join(HISTORY_FIELDNAMES) + '\r\n')
+            
+            # Write measurement (csv.writer's default \r\n line ending)
+            csvfile.write(
+                f"{datetime.now():%Y-%m-%d %H:%M:%S},{final_offset:.6f},"
+                f"{nozzle_temp:.1f},{bed_temp:.1f},{self.tap_distance_new:.6f},"
+                f"{stddev:.6f},{','.join(sample_fields)}\r\n")
+            csvfile.flush()  # One flush per measurement - a crash must not lose rows
+            self._trim_history(csv_path)
+            
+            self._debug("HISTORY", 1, "📄 Messung gespeichert in CSV: %s", csv_path)
             
             # Create plots
             current_data = {
@@ -1977,70 +2129,254 @@ class AutoOffset:
             return
         
         try:
-            # Ensure plot directory exists
-            plot_path = os.path.expanduser(self.plot_path)
-            os.makedirs(plot_path, exist_ok=True)
-            self._debug("PLOTS", 2, f"📁 Plot-Ordner: {plot_path}")
+            plot_path = self.plot_path
+            self._debug("PLOTS", 2, "📁 Plot-Ordner: %s", plot_path)
             
             # Create both plots
-            self._create_history_plot(plot_path)
-            self._create_current_plot(plot_path, current_data)
+            with self._get_pyplot().rc_context(PLOT_RC_PARAMS):
+                self._create_history_plot(plot_path)
+                self._create_current_plot(plot_path, current_data)
             
-            self._debug("PLOTS", 1, f"✅ Plots erstellt in: {plot_path}")
+            self._debug("PLOTS", 1, "✅ Plots erstellt in: %s", plot_path)
+        except Exception:
+            # Plots are optional - log only, the measurement itself succeeded
+            logging.exception("Plot creation failed")
+    
+    def _get_pyplot(self):
+        """Import matplotlib.pyplot on first use (keeps Klipper startup lean)"""
+        if self._plt is None:
+            import matplotlib
+            matplotlib.use('Agg')  # Non-interactive backend
+            import matplotlib.pyplot as plt
+            self._plt = plt
+        return self._plt
+    
+    def _get_history_file(self):
+        """Return the append handle for measurement_history.csv - kept open between measurements
+        Reopened if the file was deleted/replaced externally (own rewrites close it first)
+        """
+        csvfile = self._history_fh
+        if csvfile is not None and os.fstat(csvfile.fileno()).st_nlink == 0:
+            self._close_history_file()
+            csvfile = None
+        if csvfile is None:
+            csvfile = self._history_fh = open(self._history_csv_path, 'a', newline='')
+        return csvfile
+    
+    def _close_history_file(self):
+        """Close the history CSV handle (klippy:disconnect, before rewriting the file)"""
+        if self._history_fh is None:
+            return
+        try:
+            self._history_fh.close()
         except Exception as e:
-            error_msg = f"Plot creation failed: {e}"
-            logging.error(error_msg)
-            self.gcode.respond_info(f"⚠️ {error_msg}")
+            logging.warning("Could not close history CSV: %s", e)
+        self._history_fh = None
+    
+    def _check_history_header(self, csv_path):
+        """Verify CSV header once per process - rewrite the file once if columns changed"""
+        if self._history_header_checked:
+            return
+        self._history_header_checked = True
+        
+        if not os.path.isfile(csv_path):
+            return
+        with open(csv_path, 'r', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            if reader.fieldnames is None or reader.fieldnames == HISTORY_FIELDNAMES:
+                return
+            rows = list(reader)
+        
+        # Columns changed - rewrite with current header (missing columns stay empty)
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=HISTORY_FIELDNAMES,
+                                    restval='', extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        self._close_history_file()
+        os.replace(tmp_path, csv_path)
+        self._debug("HISTORY", 1, "📄 CSV-Spalten aktualisiert: %s", csv_path)
+    
+    def _trim_history(self, csv_path):
+        """Keep measurement_history.csv at most history_max_entries rows (ring buffer)
+        Rows are counted once and then tracked; the file is only rewritten once it
+        exceeds the limit by 25%, so trimming costs O(1) per measurement on average
+        """
+        limit = self.history_max_entries
+        if limit <= 0:
+            return
+        count = self._history_row_count
+        if count is None:
+            with open(csv_path, 'rb') as csvfile:
+                count = max(sum(1 for _ in csvfile) - 1, 0)  # Minus header
+        else:
+            count += 1
+        
+        if count > limit + max(limit // 4, 1):
+            with open(csv_path, 'r', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader)
+                rows = collections.deque(reader, maxlen=limit)
+            tmp_path = csv_path + '.tmp'
+            with open(tmp_path, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(header)
+                writer.writerows(rows)
+            self._close_history_file()
+            os.replace(tmp_path, csv_path)
+            self._debug("HISTORY", 2, "📄 CSV gekürzt: %s → %s Messungen", count, len(rows))
+            count = len(rows)
+        self._history_row_count = count
+    
+    def _save_figure(self, fig, plot_file, **kwargs):
+        """Render a PNG in memory, then write + rename it in one go
+        Moonraker/Mainsail never see a half-written image
+        """
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', **kwargs)
+        tmp_path = plot_file + '.tmp'
+        with open(tmp_path, 'wb') as pngfile:
+            pngfile.write(buf.getbuffer())
+        os.replace(tmp_path, plot_file)
+    
+    def _load_history_rows(self, csv_path):
+        """Return history CSV rows as parsed records - only parses rows appended since last call
+        Record: (timestamp, offset, trigger_distance, nozzle_temp, bed_temp)
+        Cache is keyed by path and invalidated if the file shrinks (rewritten/truncated)
+        """
+        st = os.stat(csv_path)
+        cache = self._history_cache.get(csv_path)
+        if cache is not None and cache['mtime'] == st.st_mtime and cache['size'] == st.st_size:
+            return cache['rows']
+        if cache is None or st.st_size < cache['size']:
+            cache = {'mtime': None, 'size': 0, 'offset': 0, 'fieldnames': None, 'rows': []}
+            self._history_cache[csv_path] = cache
+        
+        # Read only the bytes appended since the last parse
+        with open(csv_path, 'rb') as csvfile:
+            if cache['offset'] == 0 and self.plot_history_count > 0:
+                # First parse: header + only the tail the plots actually need
+                header = csvfile.readline()
+                if header.endswith(b'\n'):
+                    cache['fieldnames'] = next(csv.reader([header.decode('utf-8')]))
+                    cache['offset'] = self._history_tail_offset(
+                        csvfile, len(header), st.st_size, max(self.plot_history_count, 2) + 1)
+            csvfile.seek(cache['offset'])
+            data = csvfile.read()
+        
+        # Only consume complete lines (keep a partial last line for next time)
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].decode('utf-8').splitlines()
+        cache['offset'] += end
+        if lines and cache['fieldnames'] is None:
+            cache['fieldnames'] = next(csv.reader([lines.pop(0)]))
+        # Resolve column positions once instead of building a dict per row
+        try:
+            ts_col, offset_col, trigger_col, nozzle_col, bed_col = (
+                cache['fieldnames'].index(name) for name in
+                ('timestamp', 'offset', 'trigger_distance', 'nozzle_temp', 'bed_temp'))
+        except (AttributeError, ValueError):
+            logging.warning("History CSV header is missing columns: %s", cache['fieldnames'])
+            return cache['rows']
+        # Parse each row once here, so plots get ready-made columns
+        # (fromisoformat is a C parser - much cheaper than strptime per row)
+        fromisoformat = datetime.fromisoformat
+        for row in csv.reader(lines):
+            try:
+                cache['rows'].append((
+                    fromisoformat(row[ts_col]),
+                    float(row[offset_col]),
+                    float(row[trigger_col]),
+                    float(row[nozzle_col]),
+                    float(row[bed_col])
+                ))
+            except (IndexError, ValueError):
+                logging.warning("Skipping malformed history row: %s", row)
+        
+        # Plots only use the last N rows (at least 2 for the "enough data" check)
+        if self.plot_history_count > 0:
+            del cache['rows'][:-max(self.plot_history_count, 2)]
+        
+        cache['mtime'] = st.st_mtime
+        cache['size'] = st.st_size
+        return cache['rows']
+    
+    @staticmethod
+    def _history_tail_offset(csvfile, start, size, lines):
+        """Return the file offset where the last `lines` complete lines begin (never before start)
+        Reads backwards from EOF in 64 KiB chunks, so big history files are not read completely
+        """
+        chunks = []
+        newlines = 0
+        pos = size
+        while pos > start and newlines <= lines:
+            step = min(65536, pos - start)
+            pos -= step
+            csvfile.seek(pos)
+            chunk = csvfile.read(step)
+            newlines += chunk.count(b'\n')
+            chunks.append(chunk)
+        if newlines <= lines:
+            return start
+        # Skip the surplus (possibly partial) lines at the front of the tail
+        tail = b''.join(reversed(chunks))
+        cut = 0
+        for _ in range(newlines - lines):
+            cut = tail.index(b'\n', cut) + 1
+        return pos + cut
     
     def _create_history_plot(self, plot_path):
         """Create history plot of last N measurements from CSV"""
         try:
             # CSV file path
-            csv_path = os.path.join(plot_path, 'measurement_history.csv')
+            csv_path = self._history_csv_path
             
             if not os.path.isfile(csv_path):
                 self._debug("PLOTS", 2, "No CSV history file found")
                 return
             
-            # Read CSV
-            timestamps = []
-            offsets = []
-            trigger_distances = []
-            nozzle_temps = []
-            bed_temps = []
+            # CSV unchanged since the last saved plot -> PNG is still current
+            plot_file = os.path.join(plot_path, 'auto_offset_history.png')
+            st = os.stat(csv_path)
+            plot_key = (st.st_mtime, st.st_size, self.plot_history_count)
+            if plot_key == self._history_plot_key and os.path.isfile(plot_file):
+                self._debug("PLOTS", 2, "History plot unchanged: %s", plot_file)
+                return
             
-            with open(csv_path, 'r') as csvfile:
-                reader = csv.DictReader(csvfile)
-                rows = list(reader)
-                
-                if len(rows) < 2:
-                    self._debug("PLOTS", 2, "Not enough history data for plot")
-                    return
-                
-                # Get last N measurements
-                rows = rows[-self.plot_history_count:]
-                
-                # Extract data
-                for row in rows:
-                    timestamps.append(datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S'))
-                    offsets.append(float(row['offset']))
-                    trigger_distances.append(float(row['trigger_distance']))
-                    nozzle_temps.append(float(row['nozzle_temp']))
-                    bed_temps.append(float(row['bed_temp']))
+            # Read CSV (records are parsed once, see _load_history_rows)
+            records = self._load_history_rows(csv_path)
+            
+            if len(records) < 2:
+                self._debug("PLOTS", 2, "Not enough history data for plot")
+                return
+            
+            # Get last N measurements, one sequence per column
+            (timestamps, offsets, trigger_distances,
+             nozzle_temps, bed_temps) = zip(*records[-self.plot_history_count:])
             
             # Create figure with professional layout (4 rows: Header + 3 plots)
             # Z-Offset & Trigger je -5%, Temp +10% für bessere Proportionen
-            fig = plt.figure(figsize=(16, 12))
-            gs = fig.add_gridspec(4, 1, height_ratios=[0.3, 1.71, 1.71, 0.7], hspace=0.35)
+            # Figure/axes are built once and only cleared on later runs
+            if self._history_fig is None:
+                plt = self._get_pyplot()
+                fig = plt.figure(figsize=(16, 12))
+                gs = fig.add_gridspec(4, 1, height_ratios=[0.3, 1.71, 1.71, 0.7], hspace=0.35)
+                axes = tuple(fig.add_subplot(gs[i]) for i in range(4))
+                self._history_fig = (fig, axes)
+            else:
+                fig, axes = self._history_fig
+                for ax in axes:
+                    ax.clear()
+            ax_header, ax1, ax2, ax3 = axes
             
             # Header
-            ax_header = fig.add_subplot(gs[0])
             ax_header.axis('off')
             
-            avg_offset = sum(offsets) / len(offsets)
-            offset_range = max(offsets) - min(offsets)
-            avg_trigger = sum(trigger_distances) / len(trigger_distances)
-            trigger_range = max(trigger_distances) - min(trigger_distances)
+            avg_offset, min_offset, max_offset = _mean_min_max(offsets)
+            offset_range = max_offset - min_offset
+            avg_trigger, min_trigger, max_trigger = _mean_min_max(trigger_distances)
+            trigger_range = max_trigger - min_trigger
             timestamp_now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             header_text = f"""AUTO OFFSET - MEASUREMENT HISTORY
@@ -2052,10 +2388,11 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
                           facecolor='#E8F4F8', edgecolor='#0066CC', linewidth=2))
             
             # Plot 1: Z-Offset - Balken an festen Positionen
-            ax1 = fig.add_subplot(gs[1])
             
             # Feste Positionen: 1, 2, 3, ..., N (unabhängig von Zeit!)
-            positions = list(range(1, len(offsets) + 1))
+            # Array + tick labels built once, shared by all three plots
+            positions = np.arange(1, len(offsets) + 1)
+            position_labels = [f'#{p}' for p in range(1, len(offsets) + 1)]
             
             # Balken (dünn für gute Abstände)
             bars1 = ax1.bar(positions, offsets, color='#0066CC', alpha=0.7, 
@@ -2072,7 +2409,7 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             
             # X-Achse Labels: Messungsnummer (etwas kleiner)
             ax1.set_xticks(positions)
-            ax1.set_xticklabels([f'#{p}' for p in positions], fontsize=9)
+            ax1.set_xticklabels(position_labels, fontsize=9)
             
             ax1.set_xlabel('')  # Kein Label - selbsterklärend!
             ax1.set_ylabel('Z-Offset (mm)', fontsize=12, fontweight='bold')
@@ -2081,7 +2418,6 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             ax1.legend(loc='best', fontsize=10, framealpha=0.9)
             
             # Plot 2: Trigger Distance - Balken an festen Positionen
-            ax2 = fig.add_subplot(gs[2])
             
             # Balken (dünn für gute Abstände)
             bars2 = ax2.bar(positions, trigger_distances, color='#4ECDC4', alpha=0.7, 
@@ -2098,7 +2434,7 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             
             # X-Achse Labels: Messungsnummer (etwas kleiner)
             ax2.set_xticks(positions)
-            ax2.set_xticklabels([f'#{p}' for p in positions], fontsize=9)
+            ax2.set_xticklabels(position_labels, fontsize=9)
             
             ax2.set_xlabel('')  # Kein Label - selbsterklärend!
             ax2.set_ylabel('Trigger Distance (mm)', fontsize=12, fontweight='bold')
@@ -2107,7 +2443,6 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             ax2.legend(loc='best', fontsize=10, framealpha=0.9)
             
             # Plot 3: Temperatures (FLACHER! Nur Übersicht)
-            ax3 = fig.add_subplot(gs[3])
             
             # Linien (ohne Marker wegen wenig Platz)
             ax3.plot(positions, nozzle_temps, '-', color='#FF6347', linewidth=2, 
@@ -2126,15 +2461,15 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             ax3.grid(True, alpha=0.4, linestyle='--', linewidth=0.8, axis='y')
             ax3.legend(loc='best', fontsize=9, framealpha=0.9)
             
-            # Save plot with white background
-            plot_file = os.path.join(plot_path, 'auto_offset_history.png')
-            plt.savefig(plot_file, dpi=150, bbox_inches='tight', facecolor='white')
-            plt.close()
+            # Save plot with white background (100 dpi is plenty for the web UI)
+            # bbox_inches='tight' fits the canvas to labels/legends of any length
+            self._save_figure(fig, plot_file, dpi=100, bbox_inches='tight', facecolor='white')
+            self._history_plot_key = plot_key
             
-            self._debug("PLOTS", 2, f"✅ History plot saved: {plot_file}")
+            self._debug("PLOTS", 2, "✅ History plot saved: %s", plot_file)
             
-        except Exception as e:
-            logging.error(f"History plot creation failed: {e}")
+        except Exception:
+            logging.exception("History plot creation failed")
     
     def _create_current_plot(self, plot_path, data):
         """Create detailed plot of current measurement - Shake&Tune inspired design"""
@@ -2151,9 +2486,7 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             
             # Calculate statistics (echte Werte - KEIN Offset mehr!)
             if len(samples) > 0:
-                mean_sample = sum(samples) / len(samples)
-                min_sample = min(samples)
-                max_sample = max(samples)
+                mean_sample, min_sample, max_sample = _mean_min_max(samples)
                 range_sample = max_sample - min_sample
             else:
                 mean_sample = final_offset
@@ -2165,15 +2498,26 @@ Last {len(offsets)} measurements | Z-Offset Avg: {avg_offset:.6f} mm (Range: {of
             plot_samples = samples  # Echte Werte!
             plot_mean = mean_sample  # Echte Werte!
             
-            # Create figure with custom layout
-            fig = plt.figure(figsize=(16, 10))
-            
-            # Create grid for subplots (70% left for samples, 30% right for overview)
-            gs = fig.add_gridspec(3, 2, height_ratios=[0.5, 2, 1], width_ratios=[7, 3], 
-                                hspace=0.3, wspace=0.3)
+            # Create figure with custom layout (built once, cleared on later runs)
+            plt = self._get_pyplot()
+            if self._current_fig is None:
+                fig = plt.figure(figsize=(16, 10))
+                
+                # Create grid for subplots (70% left for samples, 30% right for overview)
+                gs = fig.add_gridspec(3, 2, height_ratios=[0.5, 2, 1], width_ratios=[7, 3], 
+                                    hspace=0.3, wspace=0.3)
+                axes = (fig.add_subplot(gs[0, :]),   # Header (spans full width)
+                        fig.add_subplot(gs[1, 0]),   # Probe samples
+                        fig.add_subplot(gs[1, 1]),   # Overview
+                        fig.add_subplot(gs[2, :]))   # Statistics table
+                self._current_fig = (fig, axes)
+            else:
+                fig, axes = self._current_fig
+                for ax in axes:
+                    ax.clear()
+            ax_header, ax1, ax2, ax3 = axes
             
             # Header (spans full width)
-            ax_header = fig.add_subplot(gs[0, :])
             ax_header.axis('off')
             
             # Header text - technical details like Shake&Tune
@@ -2187,25 +2531,34 @@ Probe Samples: Echte Werte mit Z=0 Referenzlinie | Y-Achse: ±{self.probe_tolera
                           facecolor='#E8F4F8', edgecolor='#0066CC', linewidth=2))
             
             # Plot 1: Probe Samples (ZOOMED!) - top row
-            ax1 = fig.add_subplot(gs[1, 0])
-            sample_nums = list(range(1, len(samples) + 1))
+            # (matplotlib depends on NumPy, so np is always importable here)
+            sample_nums = np.arange(1, len(samples) + 1)
+            if len(samples) > PLOT_MAX_BARS:
+                # Evenly spaced subset + global min/max - statistics still use all samples
+                arr = np.asarray(samples, dtype=np.float64)
+                idx = np.unique(np.concatenate((
+                    np.linspace(0, len(samples) - 1, PLOT_MAX_BARS - 2).astype(int),
+                    (arr.argmin(), arr.argmax()))))
+                plot_samples = arr[idx]
+                sample_nums = idx + 1
             
             # Use gradient colors for bars
-            colors = plt.cm.viridis([(s - min_sample) / (range_sample + 0.000001) for s in samples])
+            norm = (np.asarray(plot_samples, dtype=np.float64) - min_sample) / (range_sample + 0.000001)
+            colors = plt.cm.viridis(norm)
             bars = ax1.bar(sample_nums, plot_samples, color=colors, alpha=0.8, edgecolor='#333333', linewidth=1.5)
             
             # Add value labels on bars (echte Werte)
-            for i, (bar, val) in enumerate(zip(bars, plot_samples)):
-                height = bar.get_height()
-                # Label oberhalb oder unterhalb je nach Wert
-                if height >= 0:
-                    va = 'bottom'
-                    y_pos = height
-                else:
-                    va = 'top'
-                    y_pos = height
-                ax1.text(bar.get_x() + bar.get_width()/2., y_pos,
-                        f'{val:.6f}', ha='center', va=va, fontsize=8, fontweight='bold')
+            labels = [f'{val:.6f}' for val in plot_samples]
+            if hasattr(ax1, 'bar_label'):
+                # matplotlib >= 3.4: one call, places labels below negative bars itself
+                ax1.bar_label(bars, labels=labels, fontsize=8, fontweight='bold')
+            else:
+                for bar, label in zip(bars, labels):
+                    height = bar.get_height()
+                    # Label oberhalb oder unterhalb je nach Wert
+                    va = 'bottom' if height >= 0 else 'top'
+                    ax1.text(bar.get_x() + bar.get_width()/2., height,
+                            label, ha='center', va=va, fontsize=8, fontweight='bold')
             
             # Z=0 REFERENZLINIE (rot, gestrichelt)
             ax1.axhline(y=0, color='red', linestyle='--', linewidth=2.5, 
@@ -2228,7 +2581,6 @@ Probe Samples: Echte Werte mit Z=0 Referenzlinie | Y-Achse: ±{self.probe_tolera
             ax1.legend(loc='best', fontsize=9, framealpha=0.9)
             
             # Plot 2: Full Range Overview - top right (2 BALKEN!)
-            ax2 = fig.add_subplot(gs[1, 1])
             
             # Show measurement overview - ONLY 2 bars (ECHTE WERTE ohne Offset!)
             full_range_data = [trigger_distance, final_offset]
@@ -2255,7 +2607,6 @@ Probe Samples: Echte Werte mit Z=0 Referenzlinie | Y-Achse: ±{self.probe_tolera
             ax2.grid(True, alpha=0.4, axis='y', linestyle='--', linewidth=0.8)
             
             # Statistics Table - bottom
-            ax3 = fig.add_subplot(gs[2, :])
             ax3.axis('off')
             
             # Create professional statistics table
@@ -2270,40 +2621,39 @@ Probe Samples: Echte Werte mit Z=0 Referenzlinie | Y-Achse: ±{self.probe_tolera
                 ['Samples:', f'{len(samples)}', '', ''],
             ]
             
-            table = ax3.table(cellText=stats_data, cellLoc='left', loc='center',
+            # Colors per row class (header, separator, label/value columns) - passed to the
+            # table in one go instead of set_facecolor() per cell
+            body_colors = ['#F0F0F0', '#FFFFFF', '#F0F0F0', '#FFFFFF']
+            cell_colors = [['#0066CC'] * 4, ['#E8F4F8'] * 4] + [body_colors] * (len(stats_data) - 2)
+            table = ax3.table(cellText=stats_data, cellColours=cell_colors, cellLoc='left', loc='center',
                             colWidths=[0.25, 0.25, 0.25, 0.25])
             table.auto_set_font_size(False)
             table.set_fontsize(10)
             table.scale(1, 2)
             
-            # Style table
-            for i, row in enumerate(stats_data):
-                for j in range(4):
-                    cell = table[(i, j)]
-                    if i == 0:  # Header
-                        cell.set_facecolor('#0066CC')
-                        cell.set_text_props(weight='bold', color='white', fontsize=11)
-                    elif i == 1:  # Separator
-                        cell.set_facecolor('#E8F4F8')
-                        cell.set_text_props(fontfamily='monospace', fontsize=8)
-                    else:
-                        if j in [0, 2]:  # Labels
-                            cell.set_facecolor('#F0F0F0')
-                            cell.set_text_props(weight='bold')
-                        else:  # Values
-                            cell.set_facecolor('#FFFFFF')
-                            cell.set_text_props(fontfamily='monospace')
-                    cell.set_edgecolor('#CCCCCC')
+            # Style table text (one prepared props dict per row class)
+            header_props = dict(weight='bold', color='white', fontsize=11)
+            separator_props = dict(fontfamily='monospace', fontsize=8)
+            label_props = dict(weight='bold')
+            value_props = dict(fontfamily='monospace')
+            for (i, j), cell in table.get_celld().items():
+                if i == 0:  # Header
+                    props = header_props
+                elif i == 1:  # Separator
+                    props = separator_props
+                else:
+                    props = label_props if j in (0, 2) else value_props
+                cell.set_text_props(**props)
+                cell.set_edgecolor('#CCCCCC')
             
             # Save plot
             plot_file = os.path.join(plot_path, 'auto_offset_current.png')
-            plt.savefig(plot_file, dpi=150, bbox_inches='tight', facecolor='white')
-            plt.close()
+            self._save_figure(fig, plot_file, dpi=150, bbox_inches='tight', facecolor='white')
             
-            self._debug("PLOTS", 2, f"✅ Current plot saved: {plot_file}")
+            self._debug("PLOTS", 2, "✅ Current plot saved: %s", plot_file)
             
-        except Exception as e:
-            logging.error(f"Current plot creation failed: {e}")
+        except Exception:
+            logging.exception("Current plot creation failed")
 
 def load_config(config):
     """Load AutoOffset with integrated ProbeSilent"""